@@ -0,0 +1,274 @@
+"""
+Feedforward characterization for a single motor.
+
+Runs quasistatic ramps and dynamic steps through a speed command callback,
+collects the full-rate `MotorStats/<id>/*` samples drained from
+`MotorNTClient.read_motor_samples`, and fits the simple motor feedforward
+
+  V = kS * sign(v) + kV * v + kA * a
+
+with NumPy least squares over every recorded sample. Velocity is converted
+from rpm to rotations per second, so kV is in V/(rot/s) and kA in V/(rot/s^2).
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import time
+
+import numpy as np
+from PySide6.QtCore import QObject, QTimer, Signal
+
+# Fields interpolated onto the velocity timestamps; they hold their value
+# until the next sample
+HELD_FIELDS = ("busVoltage", "setSpeed")
+
+
+@dataclass
+class FeedforwardFit:
+    kS: float
+    kV: float
+    kA: float
+    r_squared: float
+    rmse: float
+    sample_count: int
+
+
+@dataclass
+class SweepPhase:
+    name: str
+    duration: float  # seconds
+    command: Callable[[float], float]  # elapsed seconds -> percent output
+    record: bool = True
+
+
+def default_phases(
+    ramp_rate: float = 0.1,
+    ramp_limit: float = 0.6,
+    step: float = 0.5,
+    step_duration: float = 2.0,
+    settle: float = 1.0,
+) -> List[SweepPhase]:
+    """Quasistatic ramps and dynamic steps in both directions, with an idle
+    settle phase (not recorded) between each test."""
+    ramp_duration = ramp_limit / ramp_rate
+
+    def idle(name: str) -> SweepPhase:
+        return SweepPhase(name, settle, lambda t: 0.0, record=False)
+
+    return [
+        SweepPhase(
+            "quasistatic forward",
+            ramp_duration,
+            lambda t: min(ramp_limit, ramp_rate * t),
+        ),
+        idle("settle"),
+        SweepPhase(
+            "quasistatic reverse",
+            ramp_duration,
+            lambda t: -min(ramp_limit, ramp_rate * t),
+        ),
+        idle("settle"),
+        SweepPhase("dynamic forward", step_duration, lambda t: step),
+        idle("settle"),
+        SweepPhase("dynamic reverse", step_duration, lambda t: -step),
+        idle("settle"),
+    ]
+
+
+def _align(
+    samples: Dict[str, List[Tuple[float, float]]]
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Resample voltage and velocity onto the velocity timestamps.
+
+    Returns (time, applied voltage, velocity in rot/s), or None when there is
+    not enough data to differentiate.
+    """
+    vel = np.asarray(samples.get("velocity", ()), dtype=float).reshape(-1, 2)
+    bus = np.asarray(samples.get("busVoltage", ()), dtype=float).reshape(-1, 2)
+    duty = np.asarray(samples.get("setSpeed", ()), dtype=float).reshape(-1, 2)
+    if len(vel) < 3 or len(bus) == 0 or len(duty) == 0:
+        return None
+
+    t = vel[:, 0]
+    order = np.argsort(t, kind="stable")
+    t = t[order]
+    velocity = vel[order, 1] / 60.0
+    bus_at_t = np.interp(t, bus[:, 0], bus[:, 1])
+    duty_at_t = np.interp(t, duty[:, 0], duty[:, 1])
+    return t, duty_at_t * bus_at_t, velocity
+
+
+def fit_feedforward(
+    segments: List[Dict[str, List[Tuple[float, float]]]],
+    min_velocity: float = 0.05,
+) -> Optional[FeedforwardFit]:
+    """Fit kS/kV/kA over every sample of every recorded segment.
+
+    Acceleration is differentiated per segment so phase changes do not
+    produce false spikes. Samples slower than `min_velocity` rot/s are
+    dropped because sign(v) is undefined before the motor breaks free.
+    """
+    rows = []
+    targets = []
+    for segment in segments:
+        aligned = _align(segment)
+        if aligned is None:
+            continue
+        t, voltage, velocity = aligned
+        # Duplicate timestamps would make gradient divide by zero
+        keep = np.concatenate(([True], np.diff(t) > 0))
+        t, voltage, velocity = t[keep], voltage[keep], velocity[keep]
+        if len(t) < 3:
+            continue
+        accel = np.gradient(velocity, t)
+        moving = np.abs(velocity) >= min_velocity
+        rows.append(
+            np.column_stack(
+                (np.sign(velocity[moving]), velocity[moving], accel[moving])
+            )
+        )
+        targets.append(voltage[moving])
+
+    if not rows:
+        return None
+    A = np.concatenate(rows)
+    y = np.concatenate(targets)
+    if len(y) < 3:
+        return None
+
+    coeffs, _, _, _ = np.linalg.lstsq(A, y, rcond=None)
+    residuals = y - A @ coeffs
+    ss_res = float(residuals @ residuals)
+    centered = y - y.mean()
+    ss_tot = float(centered @ centered)
+    return FeedforwardFit(
+        kS=float(coeffs[0]),
+        kV=float(coeffs[1]),
+        kA=float(coeffs[2]),
+        r_squared=1.0 - ss_res / ss_tot if ss_tot > 0 else 0.0,
+        rmse=float(np.sqrt(ss_res / len(y))),
+        sample_count=int(len(y)),
+    )
+
+
+class CharacterizationRoutine(QObject):
+    """Steps through sweep phases on a timer and fits the recorded samples.
+
+    The routine only issues speed commands; the owner is responsible for
+    draining telemetry and passing it to `add_samples` while it is running.
+    Samples are assigned to phases by their own timestamps, so `clock` must
+    return the time base of those timestamps (the NT clock, in seconds).
+    Telemetry arrives late, so the fit waits `drain_time` after the last
+    phase for the tail of the final recorded phase.
+    """
+
+    phase_changed = Signal(str)
+    finished = Signal(object)  # FeedforwardFit or None
+    aborted = Signal(str)  # reason
+
+    def __init__(
+        self,
+        send_speed: Callable[[float], None],
+        phases: Optional[List[SweepPhase]] = None,
+        interval_ms: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+        drain_time: float = 0.25,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._send_speed = send_speed
+        self._phases = phases if phases is not None else default_phases()
+        self._clock = clock
+        self.drain_time = drain_time
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+        self._index = -1
+        self._phase_start = 0.0
+        # (start, end) on `clock` of every recorded phase; end is None while open
+        self._windows: List[List[Optional[float]]] = []
+        self._samples: Dict[str, List[Tuple[float, float]]] = {}
+        # Newest sample of each held field, kept while idle to seed a sweep
+        self._held: Dict[str, Tuple[float, float]] = {}
+
+    def is_running(self) -> bool:
+        return self._timer.isActive()
+
+    def start(self) -> None:
+        self._windows = []
+        self._samples = {key: [sample] for key, sample in self._held.items()}
+        self._index = -1
+        self._advance(time.monotonic())
+        self._timer.start()
+
+    def abort(self, reason: str = "aborted") -> None:
+        if not self._timer.isActive():
+            return
+        self._timer.stop()
+        self._send_speed(0.0)
+        self.aborted.emit(reason)
+
+    def add_samples(self, samples: Dict[str, List[Tuple[float, float]]]) -> None:
+        """Append a batch from `MotorNTClient.read_motor_samples`; call it
+        while idle too so steady fields are known when a sweep starts."""
+        for key in HELD_FIELDS:
+            values = samples.get(key)
+            if values:
+                self._held[key] = max(values)
+        if not self._timer.isActive():
+            return
+        for key, values in samples.items():
+            self._samples.setdefault(key, []).extend(values)
+
+    def _segments(self) -> List[Dict[str, List[Tuple[float, float]]]]:
+        """Split the collected samples into one segment per recorded phase.
+
+        Robot code that publishes without keepDuplicates sends a steady
+        value only once, so the interpolated fields are seeded with their
+        last sample before the window.
+        """
+        segments = []
+        for start, end in self._windows:
+            segment = {}
+            for key, values in self._samples.items():
+                inside = [s for s in values if start <= s[0] < end]
+                if key in HELD_FIELDS:
+                    before = [s for s in values if s[0] < start]
+                    if before:
+                        inside.insert(0, max(before))
+                segment[key] = inside
+            segments.append(segment)
+        return segments
+
+    def _advance(self, now: float) -> None:
+        stamp = self._clock()
+        if self._windows and self._windows[-1][1] is None:
+            self._windows[-1][1] = stamp
+        self._index += 1
+        self._phase_start = now
+        if self._index >= len(self._phases):
+            return
+        phase = self._phases[self._index]
+        if phase.record:
+            self._windows.append([stamp, None])
+        self.phase_changed.emit(phase.name)
+
+    def _tick(self) -> None:
+        now = time.monotonic()
+        while (
+            self._index < len(self._phases)
+            and now - self._phase_start >= self._phases[self._index].duration
+        ):
+            self._advance(now)
+            if self._index == len(self._phases):
+                self._send_speed(0.0)
+
+        if self._index >= len(self._phases):
+            if now - self._phase_start >= self.drain_time:
+                self._timer.stop()
+                self.finished.emit(fit_feedforward(self._segments()))
+            return
+
+        phase = self._phases[self._index]
+        self._send_speed(phase.command(now - self._phase_start))
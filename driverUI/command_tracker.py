@@ -0,0 +1,244 @@
+"""
+Acknowledged, latency-tracked motor commands.
+
+Wraps a `MotorNTClient` so every speed/position/stop/reset command carries a
+sequence number. The robot echoes the newest applied sequence number on
+`MotorStats/<id>/ackSeq`; robot code that predates `ackSeq` is handled by
+inferring the acknowledgement from `setSpeed`/`position` instead; a command
+the stats already matched when it was sent is acknowledged without a
+latency sample, since nothing observable changed.
+
+Each command gets a send->apply latency measured on the host monotonic
+clock (resolution is the `poll` interval), a timeout, and a bounded number
+of retries. A newer command to the same motor supersedes older pending
+ones: they can still be acknowledged, but are never re-sent, so a stale
+speed can not be retried over a stop.
+"""
+
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Sequence
+import time
+
+import numpy as np
+
+COMMAND_KINDS = ("speed", "position", "stop", "reset")
+
+# Tolerances used when the acknowledgement has to be inferred from stats
+INFER_SPEED_TOLERANCE = 0.01  # percent output, [-1, 1]
+INFER_POSITION_TOLERANCE = 0.05  # rotations
+
+
+@dataclass
+class PendingCommand:
+    motor_id: int
+    kind: str
+    value: float
+    seq: int
+    first_sent: float
+    last_sent: float
+    attempts: int = 1
+    superseded: bool = False
+    # Stats already matched the command when it was sent, so an inferred
+    # acknowledgement says nothing about when it was applied
+    noop: bool = False
+
+
+@dataclass
+class CommandResult:
+    motor_id: int
+    kind: str
+    value: float
+    seq: int
+    attempts: int
+    acked: bool
+    inferred: bool = False
+    latency: Optional[float] = None  # seconds, None when not acknowledged
+
+
+class CommandTracker:
+    """Sequence-numbered command sender with acknowledgement tracking.
+
+    Usage:
+        tracker = CommandTracker(client)
+        tracker.send(1, "speed", 0.5)
+        for result in tracker.poll():  # call every few ms
+            ...
+        tracker.latency_percentiles(1)  # {50: 0.021, 90: 0.034, 99: 0.04}
+    """
+
+    def __init__(
+        self,
+        client,
+        timeout: float = 0.25,
+        max_retries: int = 2,
+        history: int = 500,
+    ):
+        self._client = client
+        self.timeout = timeout
+        self.max_retries = max_retries
+        # Seed from wall-clock microseconds so a restarted UI never reuses a
+        # sequence number the robot has already acknowledged
+        self._next_seq = int(time.time() * 1e6)
+        self._pending: Dict[int, List[PendingCommand]] = {}
+        self._latencies: Dict[int, Deque[float]] = {}
+        self._failures: Dict[int, int] = {}
+        self._history = history
+
+    def send(self, motor_id: int, kind: str, value: float = 0.0) -> int:
+        """Publish a command and start tracking it. Returns its sequence number."""
+        if kind not in COMMAND_KINDS:
+            raise ValueError(f"unknown command kind: {kind}")
+        seq = self._next_seq
+        self._next_seq += 1
+        now = time.monotonic()
+        pending = self._pending.setdefault(motor_id, [])
+        for older in pending:
+            older.superseded = True
+        command = PendingCommand(motor_id, kind, float(value), seq, now, now)
+        command.noop = self._already_applied(command)
+        # Track first so a failed publish (e.g. a dropped fan-out link) is
+        # retried and eventually reported like any unacknowledged command
+        pending.append(command)
+        try:
+            self._publish(motor_id, kind, value, seq)
+        except Exception:
+            pass
+        return seq
+
+    def _already_applied(self, command: PendingCommand) -> bool:
+        """True if acks are inferred for this motor and the stats already
+        match the command before it is published."""
+        try:
+            if self._client.get_ack_seq(command.motor_id) is not None:
+                return False
+            return self._infer(command, self._client.get_motor_data(command.motor_id))
+        except Exception:
+            return False
+
+    def _publish(self, motor_id: int, kind: str, value: float, seq: int) -> None:
+        if kind == "speed":
+            self._client.set_speed(motor_id, value, seq=seq)
+        elif kind == "position":
+            self._client.set_position(motor_id, value, seq=seq)
+        elif kind == "stop":
+            self._client.stop(motor_id, seq=seq)
+        elif kind == "reset":
+            self._client.reset(motor_id, seq=seq)
+
+    def poll(self) -> List[CommandResult]:
+        """Check acknowledgements, retry timed out commands and return every
+        command that completed (acknowledged or given up) since the last call."""
+        results: List[CommandResult] = []
+        now = time.monotonic()
+        for motor_id, pending in self._pending.items():
+            if not pending:
+                continue
+            try:
+                ack = self._client.get_ack_seq(motor_id)
+            except Exception:
+                ack = None
+            data = None
+            if ack is None:
+                try:
+                    data = self._client.get_motor_data(motor_id)
+                except Exception:
+                    data = None
+
+            # Acknowledging a command implies every older one on the motor has
+            # been applied or overwritten, so only the newest match matters
+            last_acked = -1
+            for index, command in enumerate(pending):
+                if ack is not None:
+                    if command.seq <= ack:
+                        last_acked = index
+                elif data is not None and self._infer(command, data):
+                    last_acked = index
+
+            remaining: List[PendingCommand] = []
+            for index, command in enumerate(pending):
+                if index <= last_acked:
+                    # An inferred match says nothing about when older,
+                    # overwritten commands or no-op commands landed, so they
+                    # get no latency
+                    implied = ack is None and (index < last_acked or command.noop)
+                    latency = None if implied else now - command.first_sent
+                    if latency is not None:
+                        self._record_latency(motor_id, latency)
+                    results.append(
+                        self._result(command, True, ack is None, latency)
+                    )
+                elif now - command.last_sent < self.timeout:
+                    remaining.append(command)
+                elif command.superseded or command.attempts > self.max_retries:
+                    self._failures[motor_id] = self._failures.get(motor_id, 0) + 1
+                    results.append(self._result(command, False))
+                else:
+                    command.attempts += 1
+                    command.last_sent = now
+                    try:
+                        self._publish(
+                            motor_id, command.kind, command.value, command.seq
+                        )
+                    except Exception:
+                        pass
+                    remaining.append(command)
+            self._pending[motor_id] = remaining
+        return results
+
+    @staticmethod
+    def _infer(command: PendingCommand, data) -> bool:
+        if command.kind == "speed":
+            return abs(data.setSpeed - command.value) <= INFER_SPEED_TOLERANCE
+        if command.kind == "stop":
+            return abs(data.setSpeed) <= INFER_SPEED_TOLERANCE
+        if command.kind == "position":
+            return abs(data.position - command.value) <= INFER_POSITION_TOLERANCE
+        if command.kind == "reset":
+            return abs(data.position) <= INFER_POSITION_TOLERANCE
+        return False
+
+    @staticmethod
+    def _result(
+        command: PendingCommand,
+        acked: bool,
+        inferred: bool = False,
+        latency: Optional[float] = None,
+    ) -> CommandResult:
+        return CommandResult(
+            motor_id=command.motor_id,
+            kind=command.kind,
+            value=command.value,
+            seq=command.seq,
+            attempts=command.attempts,
+            acked=acked,
+            inferred=inferred,
+            latency=latency,
+        )
+
+    def _record_latency(self, motor_id: int, latency: float) -> None:
+        samples = self._latencies.get(motor_id)
+        if samples is None:
+            samples = deque(maxlen=self._history)
+            self._latencies[motor_id] = samples
+        samples.append(latency)
+
+    # ------------------------ stats ------------------------
+    def has_pending(self, motor_id: Optional[int] = None) -> bool:
+        if motor_id is not None:
+            return bool(self._pending.get(motor_id))
+        return any(self._pending.values())
+
+    def failure_count(self, motor_id: int) -> int:
+        return self._failures.get(motor_id, 0)
+
+    def latency_percentiles(
+        self, motor_id: int, percentiles: Sequence[float] = (50, 90, 99)
+    ) -> Optional[Dict[float, float]]:
+        """Latency percentiles in seconds over the recent history, or None."""
+        samples = self._latencies.get(motor_id)
+        if not samples:
+            return None
+        values = np.percentile(np.fromiter(samples, dtype=float), percentiles)
+        return {p: float(v) for p, v in zip(percentiles, values)}
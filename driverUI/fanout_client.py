@@ -0,0 +1,223 @@
+"""
+Viewer-side client for the local telemetry fan-out service.
+
+`FanoutClient` offers the same methods as `MotorNTClient` (reads, sample
+queues, acknowledgements and commands), so `NTWorker` and the rest of the UI
+can use either one. Instead of opening another NT connection to the robot
+it connects to `telemetry_server.py` and keeps a local cache that a
+background thread updates from the server's batches.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+import json
+import socket
+import threading
+import time
+
+from telemetry_server import DEFAULT_LISTEN_PORT, decode_samples
+
+# Matches MotorNTClient's sample queue depth
+SAMPLE_STORAGE = 1024
+
+
+class _MotorStats:
+    """Plain attribute bag with the MotorData field names."""
+
+    __slots__ = (
+        "busVoltage",
+        "outputCurrent",
+        "temperature",
+        "velocity",
+        "setSpeed",
+        "position",
+    )
+
+    def __init__(self):
+        for key in self.__slots__:
+            setattr(self, key, 0.0)
+
+
+class FanoutClient:
+    """Drop-in replacement for `MotorNTClient` backed by the fan-out service.
+
+    Usage:
+        client = FanoutClient("127.0.0.1", 5811)
+        client.start()
+        data = client.get_motor_data(1)
+        client.set_speed(1, 0.5)
+        client.stop_client()
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_LISTEN_PORT,
+        rate: float = 50.0,
+        motors: Optional[Iterable[int]] = None,
+        reconnect_delay: float = 1.0,
+    ):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.motors = list(motors) if motors is not None else None
+        self.reconnect_delay = reconnect_delay
+
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._stats: Dict[int, _MotorStats] = {}
+        self._samples: Dict[int, Dict[str, Deque[Tuple[float, float]]]] = {}
+        self._acks: Dict[int, int] = {}
+        # Server NT clock minus local monotonic clock, from the newest samples
+        self._clock_offset: Optional[float] = None
+        self._sock: Optional[socket.socket] = None
+        self._running = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------ lifecycle ------------------------
+    def start(self) -> None:
+        """Connect in the background; reconnects automatically if dropped."""
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._run, name="FanoutClient", daemon=True
+        )
+        self._thread.start()
+
+    def stop_client(self) -> None:
+        self._running.clear()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        while self._running.is_set():
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=2.0)
+            except OSError:
+                time.sleep(self.reconnect_delay)
+                continue
+            sock.settimeout(None)
+            self._sock = sock
+            try:
+                self._send({"op": "hello", "rate": self.rate, "motors": self.motors})
+                with sock.makefile("rb") as stream:
+                    for line in stream:
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError, TypeError):
+                            continue
+            except OSError:
+                pass
+            finally:
+                self._sock = None
+                sock.close()
+            if self._running.is_set():
+                time.sleep(self.reconnect_delay)
+
+    def _apply(self, batch: dict) -> None:
+        with self._lock:
+            for motor_id, changed in batch.get("stats", {}).items():
+                stats = self._stats.setdefault(int(motor_id), _MotorStats())
+                for key, value in changed.items():
+                    if key in _MotorStats.__slots__:
+                        setattr(stats, key, float(value))
+            for motor_id, ack in batch.get("acks", {}).items():
+                self._acks[int(motor_id)] = int(ack)
+            for motor_id, fields in batch.get("samples", {}).items():
+                queues = self._samples.get(int(motor_id))
+                if queues is None:
+                    # Nobody has asked for this motor's samples yet
+                    continue
+                for key, encoded in fields.items():
+                    queue = queues.get(key)
+                    if queue is None:
+                        continue
+                    decoded = decode_samples(encoded)
+                    queue.extend(decoded)
+                    if decoded:
+                        # Transport delay only makes the offset smaller, so
+                        # the largest one seen is the best estimate
+                        offset = decoded[-1][0] - time.monotonic()
+                        if self._clock_offset is None or offset > self._clock_offset:
+                            self._clock_offset = offset
+
+    def _send(self, message: dict) -> None:
+        sock = self._sock
+        if sock is None:
+            raise ConnectionError("not connected to the telemetry fan-out service")
+        data = json.dumps(message, separators=(",", ":")).encode() + b"\n"
+        with self._send_lock:
+            sock.sendall(data)
+
+    # ------------------------ reads ------------------------
+    def list_motor_ids(self) -> List[int]:
+        with self._lock:
+            return sorted(self._stats)
+
+    def get_motor_data(self, motor_id: int) -> _MotorStats:
+        """Latest cached stats; all zeros until the first batch arrives."""
+        with self._lock:
+            cached = self._stats.get(motor_id)
+            snapshot = _MotorStats()
+            if cached is not None:
+                for key in _MotorStats.__slots__:
+                    setattr(snapshot, key, getattr(cached, key))
+            return snapshot
+
+    def read_motor_samples(self, motor_id: int) -> Dict[str, List[Tuple[float, float]]]:
+        """Drain every sample received since the previous call (the first
+        call only sets up the queues, like MotorNTClient)."""
+        with self._lock:
+            queues = self._samples.get(motor_id)
+            if queues is None:
+                self._samples[motor_id] = {
+                    key: deque(maxlen=SAMPLE_STORAGE) for key in _MotorStats.__slots__
+                }
+                return {key: [] for key in _MotorStats.__slots__}
+            out = {key: list(queue) for key, queue in queues.items()}
+            for queue in queues.values():
+                queue.clear()
+            return out
+
+    def now(self) -> float:
+        """Estimate of the server's NT clock, the time base of the samples."""
+        with self._lock:
+            offset = self._clock_offset
+        return time.monotonic() + (offset if offset is not None else 0.0)
+
+    def get_ack_seq(self, motor_id: int) -> Optional[int]:
+        with self._lock:
+            return self._acks.get(motor_id)
+
+    # ------------------------ commands ------------------------
+    def _command(
+        self, motor_id: int, kind: str, value: float, seq: Optional[int]
+    ) -> None:
+        self._send(
+            {"op": "cmd", "id": int(motor_id), "kind": kind, "value": value, "seq": seq}
+        )
+
+    def set_speed(
+        self, motor_id: int, percent_output: float, seq: Optional[int] = None
+    ) -> None:
+        self._command(motor_id, "speed", float(percent_output), seq)
+
+    def set_position(
+        self, motor_id: int, rotations: float, seq: Optional[int] = None
+    ) -> None:
+        self._command(motor_id, "position", float(rotations), seq)
+
+    def stop(self, motor_id: int, seq: Optional[int] = None) -> None:
+        self._command(motor_id, "stop", 0.0, seq)
+
+    def reset(self, motor_id: int, seq: Optional[int] = None) -> None:
+        self._command(motor_id, "reset", 0.0, seq)
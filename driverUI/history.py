@@ -0,0 +1,308 @@
+"""
+Tiered level-of-detail telemetry history.
+
+Each series keeps the most recent samples at full rate in a ring buffer and
+folds older data into fixed-size rings of min/max/mean buckets (1 s, 10 s and
+1 min by default). Tiers are updated incrementally as batches from
+`MotorNTClient.read_motor_samples` arrive: a bucket is only written when it
+closes, and a closed bucket is folded into the next coarser tier. Every ring
+is allocated once, so memory per series is fixed no matter how long a session
+runs (roughly 140 kB per field with the defaults, about 55 MB for 64 motors
+with all six stats fields).
+
+Queries pick the finest level that covers the requested span within a point
+budget, so zooming out on a long soak test reads a few hundred coarse
+buckets instead of millions of raw samples. Raw samples that cover the span
+but exceed the budget are reduced to min/max/mean buckets of one point each,
+so recent data stays at full rate as far as the plot can show it.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# (bucket width in seconds, number of buckets kept)
+DEFAULT_TIERS: Tuple[Tuple[float, int], ...] = (
+    (1.0, 1800),  # 30 minutes
+    (10.0, 1080),  # 3 hours
+    (60.0, 1440),  # 24 hours
+)
+
+
+@dataclass
+class HistorySlice:
+    """Query result; for raw data min, max and mean are the same array."""
+
+    times: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
+    means: np.ndarray
+    bucket_width: float  # 0.0 for raw samples
+
+
+class _Ring:
+    """Fixed-capacity chronological ring of parallel columns."""
+
+    def __init__(self, capacity: int, dtypes: Dict[str, type]):
+        self.capacity = capacity
+        self.columns = {
+            name: np.zeros(capacity, dtype=dt) for name, dt in dtypes.items()
+        }
+        self.head = 0  # next write index
+        self.size = 0
+
+    def append(self, **values) -> None:
+        for name, value in values.items():
+            self.columns[name][self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        self.size = min(self.capacity, self.size + 1)
+
+    def extend(self, **arrays: np.ndarray) -> None:
+        count = len(next(iter(arrays.values())))
+        if count == 0:
+            return
+        if count > self.capacity:
+            arrays = {name: a[-self.capacity :] for name, a in arrays.items()}
+            count = self.capacity
+        index = (self.head + np.arange(count)) % self.capacity
+        for name, array in arrays.items():
+            self.columns[name][index] = array
+        self.head = (self.head + count) % self.capacity
+        self.size = min(self.capacity, self.size + count)
+
+    def oldest(self, name: str) -> Optional[float]:
+        if self.size == 0:
+            return None
+        return float(self.columns[name][(self.head - self.size) % self.capacity])
+
+    def ordered(self, name: str) -> np.ndarray:
+        column = self.columns[name]
+        start = (self.head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return column[start : start + self.size]
+        return np.concatenate((column[start:], column[: self.head]))
+
+
+class _Tier:
+    """Ring of closed min/max/mean buckets plus the currently open bucket."""
+
+    def __init__(self, width: float, capacity: int):
+        self.width = width
+        self.ring = _Ring(
+            capacity,
+            {
+                "start": np.float64,
+                "min": np.float32,
+                "max": np.float32,
+                "mean": np.float32,
+                "count": np.int32,
+            },
+        )
+        self._open_start: Optional[float] = None
+        self._open_min = 0.0
+        self._open_max = 0.0
+        self._open_sum = 0.0
+        self._open_count = 0
+
+    def add(
+        self, start: float, mn: float, mx: float, total: float, count: int
+    ) -> Optional[Tuple[float, float, float, float, int]]:
+        """Merge an aggregate starting at `start` into this tier.
+
+        Returns the bucket that closed as a result, in the same
+        (start, min, max, sum, count) form, so it can feed the next tier.
+        """
+        bucket = np.floor(start / self.width) * self.width
+        closed = None
+        if self._open_start is not None and bucket != self._open_start:
+            closed = self._close()
+        if self._open_start is None:
+            self._open_start = bucket
+            self._open_min = mn
+            self._open_max = mx
+            self._open_sum = total
+            self._open_count = count
+        else:
+            self._open_min = min(self._open_min, mn)
+            self._open_max = max(self._open_max, mx)
+            self._open_sum += total
+            self._open_count += count
+        return closed
+
+    def _close(self) -> Tuple[float, float, float, float, int]:
+        closed = (
+            self._open_start,
+            self._open_min,
+            self._open_max,
+            self._open_sum,
+            self._open_count,
+        )
+        self.ring.append(
+            start=self._open_start,
+            min=self._open_min,
+            max=self._open_max,
+            mean=self._open_sum / self._open_count,
+            count=self._open_count,
+        )
+        self._open_start = None
+        return closed
+
+    def oldest(self) -> Optional[float]:
+        oldest = self.ring.oldest("start")
+        return oldest if oldest is not None else self._open_start
+
+    def count_between(self, t0: float, t1: float) -> int:
+        oldest = self.oldest()
+        if oldest is not None:
+            t0 = max(t0, oldest)
+        return int(max(0.0, t1 - t0) / self.width) + 1
+
+    def slice(self, t0: float, t1: float) -> HistorySlice:
+        starts = self.ring.ordered("start")
+        lo = np.searchsorted(starts, t0 - self.width, side="right")
+        hi = np.searchsorted(starts, t1, side="right")
+        times = starts[lo:hi]
+        mins = self.ring.ordered("min")[lo:hi]
+        maxs = self.ring.ordered("max")[lo:hi]
+        means = self.ring.ordered("mean")[lo:hi]
+        if self._open_start is not None and self._open_start <= t1:
+            times = np.append(times, self._open_start)
+            mins = np.append(mins, self._open_min)
+            maxs = np.append(maxs, self._open_max)
+            means = np.append(means, self._open_sum / self._open_count)
+        # Plot buckets at their centers
+        return HistorySlice(times + self.width / 2, mins, maxs, means, self.width)
+
+
+def _decimate(
+    times: np.ndarray, values: np.ndarray, t0: float, t1: float, buckets: int
+) -> HistorySlice:
+    """Reduce raw samples to at most `buckets` equal-width min/max/mean buckets."""
+    width = max(t1 - t0, 1e-9) / buckets
+    ids = np.minimum(np.floor((times - t0) / width), buckets - 1)
+    edges = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1))
+    counts = np.diff(np.append(edges, len(values)))
+    return HistorySlice(
+        t0 + (ids[edges] + 0.5) * width,
+        np.minimum.reduceat(values, edges),
+        np.maximum.reduceat(values, edges),
+        np.add.reduceat(values.astype(np.float64), edges) / counts,
+        width,
+    )
+
+
+class SeriesHistory:
+    """Full-rate recent samples plus progressively coarser tiers."""
+
+    def __init__(
+        self,
+        raw_capacity: int = 3200,  # just over a minute at 50 Hz
+        tiers: Sequence[Tuple[float, int]] = DEFAULT_TIERS,
+    ):
+        self._raw = _Ring(raw_capacity, {"time": np.float64, "value": np.float32})
+        self._tiers = [_Tier(width, capacity) for width, capacity in tiers]
+        self._latest: Optional[float] = None
+        self._first: Optional[float] = None
+
+    def latest_time(self) -> Optional[float]:
+        return self._latest
+
+    def add(self, samples: Sequence[Tuple[float, float]]) -> None:
+        """Append (timestamp_seconds, value) samples in arrival order."""
+        if len(samples) == 0:
+            return
+        data = np.asarray(samples, dtype=float).reshape(-1, 2)
+        times = data[:, 0]
+        values = data[:, 1]
+        if self._latest is not None:
+            # Drop anything that would go backwards in time (e.g. a replayed queue)
+            newer = times > self._latest
+            times, values = times[newer], values[newer]
+            if len(times) == 0:
+                return
+        if self._first is None:
+            self._first = float(times[0])
+        self._latest = float(times[-1])
+        self._raw.extend(time=times, value=values)
+        if not self._tiers:
+            return
+
+        # Aggregate the batch per finest-tier bucket, then cascade closed buckets
+        width = self._tiers[0].width
+        ids = np.floor(times / width)
+        edges = np.concatenate(([0], np.flatnonzero(np.diff(ids)) + 1, [len(ids)]))
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            chunk = values[lo:hi]
+            aggregate = (
+                float(times[lo]),
+                float(chunk.min()),
+                float(chunk.max()),
+                float(chunk.sum()),
+                int(hi - lo),
+            )
+            for tier in self._tiers:
+                aggregate = tier.add(*aggregate)
+                if aggregate is None:
+                    break
+
+    def query(self, t0: float, t1: float, max_points: int = 500) -> HistorySlice:
+        """Return the finest data covering [t0, t1] within `max_points`."""
+        raw_oldest = self._raw.oldest("time")
+        # Nothing exists before the first sample, so a store that still holds
+        # it covers a span starting earlier than that
+        start = max(t0, self._first) if self._first is not None else t0
+        if raw_oldest is not None and raw_oldest <= start:
+            times = self._raw.ordered("time")
+            lo = np.searchsorted(times, t0, side="left")
+            hi = np.searchsorted(times, t1, side="right")
+            values = self._raw.ordered("value")[lo:hi]
+            if hi - lo <= max_points:
+                return HistorySlice(times[lo:hi], values, values, values, 0.0)
+            return _decimate(times[lo:hi], values, t0, t1, max_points)
+
+        for tier in self._tiers:
+            oldest = tier.oldest()
+            covers = oldest is not None and oldest <= start
+            if covers and tier.count_between(t0, t1) <= max_points:
+                return tier.slice(t0, t1)
+
+        # Nothing covers the whole span: prefer the tier reaching furthest back
+        # that still fits the budget, falling back to the coarsest
+        for tier in self._tiers:
+            if tier.count_between(t0, t1) <= max_points:
+                return tier.slice(t0, t1)
+        if self._tiers:
+            return self._tiers[-1].slice(t0, t1)
+        empty = np.zeros(0)
+        return HistorySlice(empty, empty, empty, empty, 0.0)
+
+
+class MotorHistory:
+    """History for every `MotorStats/<id>/*` field of one motor."""
+
+    def __init__(self, fields: Sequence[str], **series_options):
+        self._series: Dict[str, SeriesHistory] = {
+            key: SeriesHistory(**series_options) for key in fields
+        }
+
+    def fields(self) -> List[str]:
+        return list(self._series)
+
+    def add_samples(self, samples: Dict[str, Sequence[Tuple[float, float]]]) -> None:
+        """Add a batch from `MotorNTClient.read_motor_samples`."""
+        for key, values in samples.items():
+            series = self._series.get(key)
+            if series is not None:
+                series.add(values)
+
+    def latest_time(self) -> Optional[float]:
+        times = [s.latest_time() for s in self._series.values()]
+        times = [t for t in times if t is not None]
+        return max(times) if times else None
+
+    def query(
+        self, key: str, t0: float, t1: float, max_points: int = 500
+    ) -> HistorySlice:
+        return self._series[key].query(t0, t1, max_points)
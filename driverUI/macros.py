@@ -0,0 +1,217 @@
+"""
+Operator macro recording and timed playback.
+
+`MacroRecorder` stores each operator command with its offset from the start
+of the recording, taken from `time.perf_counter()`. `MacroPlayer` replays a
+recording on its own thread, on the recorded motors or retargeted to others.
+Every event is
+scheduled at an absolute deadline (start + offset * time_scale), so timing
+errors do not accumulate the way chained single-shot timers do: the thread
+sleeps until just before each deadline and spins for the last stretch.
+"""
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+from command_tracker import COMMAND_KINDS
+
+# Sleeping is only accurate to about a millisecond on most OSes; the last
+# part of each wait is spent spinning on perf_counter instead
+SPIN_THRESHOLD = 0.002  # seconds
+
+
+@dataclass
+class MacroEvent:
+    offset: float  # seconds since the recording started
+    motor_id: int
+    kind: str  # a CommandTracker kind: speed, position, stop, reset
+    value: float = 0.0
+
+
+class MacroRecorder:
+    """Collects operator commands into a list of MacroEvent."""
+
+    def __init__(self):
+        self._start: Optional[float] = None
+        self._events: List[MacroEvent] = []
+
+    def is_recording(self) -> bool:
+        return self._start is not None
+
+    def start(self) -> None:
+        self._events = []
+        self._start = time.perf_counter()
+
+    def record(
+        self, motor_id: int, kind: str, value: float, timestamp: Optional[float] = None
+    ) -> None:
+        """Add a command; `timestamp` is a perf_counter() reading taken when
+        the operator acted (defaults to now)."""
+        if self._start is None:
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        offset = max(0.0, timestamp - self._start)
+        self._events.append(MacroEvent(offset, int(motor_id), kind, float(value)))
+
+    def stop(self) -> List[MacroEvent]:
+        self._start = None
+        return list(self._events)
+
+
+def save_macro(path: str, events: Sequence[MacroEvent]) -> None:
+    with open(path, "w") as f:
+        json.dump([asdict(event) for event in events], f, indent=2)
+
+
+def load_macro(path: str) -> List[MacroEvent]:
+    with open(path) as f:
+        raw = json.load(f)
+    events = [
+        MacroEvent(
+            offset=float(item["offset"]),
+            motor_id=int(item["motor_id"]),
+            kind=str(item["kind"]),
+            value=float(item.get("value", 0.0)),
+        )
+        for item in raw
+    ]
+    for event in events:
+        if event.kind not in COMMAND_KINDS:
+            raise ValueError(f"unknown command kind: {event.kind}")
+    events.sort(key=lambda event: event.offset)
+    return events
+
+
+def retarget(
+    events: Sequence[MacroEvent], targets: Sequence[int]
+) -> Dict[int, Tuple[int, ...]]:
+    """Map each recorded motor id to the target ids it is replayed on.
+
+    A single-motor macro is sent to every target. A multi-motor macro maps
+    its motors, in order of first use, onto the targets one to one; any
+    other combination is ambiguous and raises ValueError.
+    """
+    recorded: List[int] = []
+    for event in events:
+        if event.motor_id not in recorded:
+            recorded.append(event.motor_id)
+    if len(recorded) == 1:
+        return {recorded[0]: tuple(targets)}
+    if len(recorded) != len(targets):
+        raise ValueError(
+            f"macro drives {len(recorded)} motors, give {len(recorded)} target IDs"
+        )
+    return {motor_id: (target,) for motor_id, target in zip(recorded, targets)}
+
+
+class MacroPlayer(QObject):
+    """Replays MacroEvents through a thread-safe `send(motor_id, kind, value)`
+    callable such as `NTWorker.send`.
+
+    `time_scale` stretches the recording: 2.0 plays at half speed, 0.5 at
+    double speed.
+    """
+
+    progress = Signal(int, int)  # events sent, total events
+    # Emitted with the worst lateness in seconds and whether playback ran to
+    # the end (False when stopped early)
+    finished = Signal(float, bool)
+
+    def __init__(
+        self, send: Callable[[int, str, float], None], parent: Optional[QObject] = None
+    ):
+        super().__init__(parent)
+        self._send = send
+        self._thread: Optional[threading.Thread] = None
+        self._cancel = threading.Event()
+
+    def is_playing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def play(
+        self,
+        events: Sequence[MacroEvent],
+        targets: Optional[Sequence[int]] = None,
+        time_scale: float = 1.0,
+    ) -> bool:
+        """Start playback; returns False if a macro is already playing.
+
+        With `targets` the recorded motors are replaced as described in
+        `retarget`, which raises ValueError for an ambiguous mapping.
+        """
+        if self.is_playing():
+            return False
+        if time_scale <= 0:
+            raise ValueError("time_scale must be positive")
+        mapping = retarget(events, targets) if targets else None
+        self._cancel.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(list(events), mapping, time_scale),
+            name="MacroPlayer",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Cancel playback; motors that were being driven are sent a stop."""
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _wait_until(self, deadline: float) -> bool:
+        """Sleep/spin until `deadline`; returns False if cancelled."""
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return True
+            if remaining > SPIN_THRESHOLD:
+                if self._cancel.wait(remaining - SPIN_THRESHOLD):
+                    return False
+            elif self._cancel.is_set():
+                return False
+
+    def _run(
+        self,
+        events: List[MacroEvent],
+        mapping: Optional[Dict[int, Tuple[int, ...]]],
+        time_scale: float,
+    ) -> None:
+        driven = set()
+        worst_late = 0.0
+        completed = True
+        start = time.perf_counter()
+        for index, event in enumerate(events):
+            deadline = start + event.offset * time_scale
+            if not self._wait_until(deadline):
+                completed = False
+                break
+            worst_late = max(worst_late, time.perf_counter() - deadline)
+            if mapping is not None:
+                motor_ids = mapping[event.motor_id]
+            else:
+                motor_ids = (event.motor_id,)
+            for motor_id in motor_ids:
+                try:
+                    self._send(motor_id, event.kind, event.value)
+                except Exception:
+                    pass
+                driven.add(motor_id)
+            self.progress.emit(index + 1, len(events))
+
+        if not completed:
+            for motor_id in driven:
+                try:
+                    self._send(motor_id, "stop", 0.0)
+                except Exception:
+                    pass
+        self.finished.emit(worst_late, completed)
@@ -1,3 +1,4 @@
+import os
 import sys
 
 
@@ -13,6 +14,16 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt
 from widgets import create_motor_button
 from widgets import motor_display
+from widgets import macro_bar
+from nt_worker import NTWorker
+from fanout_client import FanoutClient
+
+# Attempt to import the NT client. If not available, the UI still runs
+# without live data.
+try:
+    from test import MotorNTClient  # adjust module name if needed
+except Exception:  # pragma: no cover
+    MotorNTClient = None  # type: ignore
 
 
 class MainWindow(QMainWindow):
@@ -22,6 +33,14 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Motor Test Bench")
         self.resize(1145, 720)
 
+        # One NT connection shared by every motor card, serviced off the GUI
+        # thread so a slow read or reconnect never freezes the Stop button
+        self.nt_worker = None
+        client = self._create_client()
+        if client is not None:
+            self.nt_worker = NTWorker(client, parent=self)
+            self.nt_worker.start()
+
         layout = QVBoxLayout()
         layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
@@ -33,6 +52,9 @@ class MainWindow(QMainWindow):
         horizontal_line.setFrameShape(QFrame.Shape.HLine)
         layout.addWidget(horizontal_line)
 
+        self.macro_bar = macro_bar.MacroBar(self.nt_worker)
+        layout.addWidget(self.macro_bar)
+
         self.master_motor_layout = QHBoxLayout()
         self.motor_layout = QHBoxLayout()
         self.master_motor_layout.addLayout(self.motor_layout)
@@ -50,6 +72,20 @@ class MainWindow(QMainWindow):
         widget.setLayout(layout)
         self.setCentralWidget(widget)
 
+    def _create_client(self):
+        # NT_FANOUT=host:port shares the connection held by telemetry_server.py
+        # instead of opening another NT client against the robot
+        fanout = os.environ.get("NT_FANOUT")
+        if fanout:
+            host, _, port = fanout.rpartition(":")
+            try:
+                return FanoutClient(host or "127.0.0.1", int(port))
+            except ValueError:
+                print(f"Invalid NT_FANOUT '{fanout}', expected host:port")
+        if MotorNTClient is not None:
+            return MotorNTClient()
+        return None
+
     def _remove_trailing_stretch(self):
         count = self.master_motor_layout.count()
         if count > 0:
@@ -90,8 +126,11 @@ class MainWindow(QMainWindow):
             return
 
         self._remove_trailing_stretch()
-        widget = motor_display.MotorDisplay(motor_type, unique_id, encoder_attached)
+        widget = motor_display.MotorDisplay(
+            motor_type, unique_id, encoder_attached, self.nt_worker
+        )
         widget.close_requested.connect(self.remove_motor_display)
+        widget.operator_command.connect(self.macro_bar.record)
         self.used_ids.add(unique_id)
         self.displayCount += 1
         self.motor_layout.addWidget(widget, 1)
@@ -109,6 +148,11 @@ class MainWindow(QMainWindow):
             self.displayCount = max(0, self.displayCount - 1)
             self._update_layout_state()
 
+    def closeEvent(self, event):
+        if self.nt_worker is not None:
+            self.nt_worker.stop()
+        super().closeEvent(event)
+
     def _next_available_device_id(self, start):
         minimum = self.create_control.can_id_spin.minimum()
         maximum = self.create_control.can_id_spin.maximum()
@@ -0,0 +1,262 @@
+"""
+Background NetworkTables worker.
+
+A single thread owns the `MotorNTClient` and the `CommandTracker`: it does all
+NT reads, float conversions and command publishes, so a slow call or a
+reconnect never blocks the Qt GUI thread. Widgets receive immutable
+`MotorSnapshot` tuples through a queued `snapshot_ready` signal.
+
+Delivery is back-pressured per motor: the worker keeps at most one pending
+snapshot per motor and only signals when none is outstanding. If the GUI
+falls behind, newer stats replace older ones and the full-rate samples are
+appended (up to a cap) so history and fits still see every sample.
+
+Characterization sweeps send their speeds as `sweep` commands. Any other
+stop for the motor, from a card, a macro or a cancelled macro, blocks the
+sweep's commands on the worker thread until the next `begin_sweep`, so a
+sweep speed already queued behind the stop can never override it.
+"""
+
+from __future__ import annotations
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Set, Tuple
+import queue
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+
+from command_tracker import CommandTracker
+
+# Samples kept per field while a snapshot waits for the GUI
+MAX_PENDING_SAMPLES = 4096
+
+
+class MotorSnapshot(NamedTuple):
+    motor_id: int
+    time: float  # host monotonic seconds when read
+    busVoltage: float
+    outputCurrent: float
+    temperature: float
+    velocity: float
+    setSpeed: float
+    position: float
+    # field -> ((timestamp_seconds, value), ...) since the previous snapshot
+    samples: Mapping[str, Tuple[Tuple[float, float], ...]]
+    # (p50, p90, p99) command latency in seconds, or None before any ack
+    latency: Optional[Tuple[float, float, float]]
+    lost_commands: int
+
+
+class NTWorker(QObject):
+    """Owns the NT client on a worker thread and publishes snapshots.
+
+    Usage:
+        worker = NTWorker(MotorNTClient())
+        worker.start()
+        worker.add_motor(1)
+        worker.snapshot_ready.connect(on_ready)  # on_ready(motor_id)
+        snapshot = worker.take_snapshot(1)
+        worker.send(1, "speed", 0.5)
+        worker.stop()
+    """
+
+    snapshot_ready = Signal(int)
+    command_finished = Signal(object)  # CommandResult
+    motor_stopped = Signal(int)  # a non-sweep stop was published
+
+    def __init__(
+        self,
+        client,
+        poll_interval: float = 0.02,
+        ack_interval: float = 0.005,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._client = client
+        self._tracker = CommandTracker(client)
+        self.poll_interval = poll_interval
+        self.ack_interval = ack_interval
+
+        self._requests: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+
+        # Worker-thread state
+        self._motors: Set[int] = set()
+        self._latency: Dict[int, Optional[Tuple[float, float, float]]] = {}
+        self._sweep_blocked: Set[int] = set()
+
+        # Shared with the GUI thread, guarded by _lock
+        self._lock = threading.Lock()
+        self._mailbox: Dict[int, MotorSnapshot] = {}
+        self._sweeping: Set[int] = set()
+
+    # ------------------------ GUI thread API ------------------------
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._running.set()
+        self._thread = threading.Thread(
+            target=self._run, name="NTWorker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._running.clear()
+        self._requests.put(("wake",))
+        self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def add_motor(self, motor_id: int) -> None:
+        self._requests.put(("add", int(motor_id)))
+
+    def remove_motor(self, motor_id: int) -> None:
+        self._requests.put(("remove", int(motor_id)))
+
+    def send(
+        self, motor_id: int, kind: str, value: float = 0.0, sweep: bool = False
+    ) -> None:
+        """Queue a command; it is published as soon as the worker wakes.
+        Safe to call from any thread."""
+        self._requests.put(("send", int(motor_id), kind, float(value), sweep))
+
+    def begin_sweep(self, motor_id: int) -> None:
+        """Mark a motor as characterized; its `sweep` commands pass again."""
+        with self._lock:
+            self._sweeping.add(int(motor_id))
+        self._requests.put(("sweep", int(motor_id)))
+
+    def end_sweep(self, motor_id: int) -> None:
+        with self._lock:
+            self._sweeping.discard(int(motor_id))
+
+    def is_sweeping(self, motor_id: int) -> bool:
+        with self._lock:
+            return int(motor_id) in self._sweeping
+
+    def now(self) -> float:
+        """The client's sample clock in seconds; cheap and safe to call from
+        the GUI thread."""
+        return self._client.now()
+
+    def take_snapshot(self, motor_id: int) -> Optional[MotorSnapshot]:
+        """Pop the latest snapshot for a motor (None if already taken)."""
+        with self._lock:
+            return self._mailbox.pop(motor_id, None)
+
+    # ------------------------ worker thread ------------------------
+    def _run(self) -> None:
+        try:
+            self._client.start()
+        except Exception:
+            # Keep serving commands/reads; ntcore reconnects on its own
+            pass
+
+        next_poll = time.monotonic()
+        next_ack = next_poll
+        while self._running.is_set():
+            now = time.monotonic()
+            deadline = next_poll
+            if self._tracker.has_pending():
+                deadline = min(deadline, next_ack)
+            try:
+                request = self._requests.get(timeout=max(0.0, deadline - now))
+            except queue.Empty:
+                request = None
+            if request is not None:
+                self._handle(request)
+
+            now = time.monotonic()
+            if now >= next_ack:
+                self._poll_commands()
+                next_ack = now + self.ack_interval
+            if now >= next_poll:
+                self._poll_motors()
+                # Fixed cadence; if a slow NT call overran, skip ahead instead
+                # of firing a burst of catch-up polls
+                next_poll += self.poll_interval
+                if next_poll < now:
+                    next_poll = now + self.poll_interval
+
+    def _handle(self, request: tuple) -> None:
+        action = request[0]
+        if action == "add":
+            self._motors.add(request[1])
+            try:
+                # Set up the sample queues now so the first poll has data
+                self._client.read_motor_samples(request[1])
+            except Exception:
+                pass
+        elif action == "remove":
+            self._motors.discard(request[1])
+            with self._lock:
+                self._mailbox.pop(request[1], None)
+        elif action == "sweep":
+            self._sweep_blocked.discard(request[1])
+        elif action == "send":
+            _, motor_id, kind, value, sweep = request
+            if sweep and motor_id in self._sweep_blocked:
+                return
+            try:
+                self._tracker.send(motor_id, kind, value)
+            except Exception:
+                pass
+            if kind == "stop" and not sweep:
+                self._sweep_blocked.add(motor_id)
+                self.motor_stopped.emit(motor_id)
+
+    def _poll_commands(self) -> None:
+        if not self._tracker.has_pending():
+            return
+        changed = set()
+        for result in self._tracker.poll():
+            changed.add(result.motor_id)
+            self.command_finished.emit(result)
+        for motor_id in changed:
+            stats = self._tracker.latency_percentiles(motor_id)
+            self._latency[motor_id] = (
+                (stats[50], stats[90], stats[99]) if stats is not None else None
+            )
+
+    def _poll_motors(self) -> None:
+        for motor_id in tuple(self._motors):
+            try:
+                data = self._client.get_motor_data(motor_id)
+                samples = self._client.read_motor_samples(motor_id)
+            except Exception:
+                continue
+            snapshot = MotorSnapshot(
+                motor_id=motor_id,
+                time=time.monotonic(),
+                busVoltage=data.busVoltage,
+                outputCurrent=data.outputCurrent,
+                temperature=data.temperature,
+                velocity=data.velocity,
+                setSpeed=data.setSpeed,
+                position=data.position,
+                samples=MappingProxyType(
+                    {key: tuple(values) for key, values in samples.items()}
+                ),
+                latency=self._latency.get(motor_id),
+                lost_commands=self._tracker.failure_count(motor_id),
+            )
+            self._post(snapshot)
+
+    def _post(self, snapshot: MotorSnapshot) -> None:
+        with self._lock:
+            previous = self._mailbox.get(snapshot.motor_id)
+            if previous is not None:
+                # GUI has not caught up: keep the newest stats, carry the samples
+                merged = {}
+                for key in set(previous.samples) | set(snapshot.samples):
+                    combined = previous.samples.get(key, ()) + snapshot.samples.get(
+                        key, ()
+                    )
+                    merged[key] = combined[-MAX_PENDING_SAMPLES:]
+                snapshot = snapshot._replace(samples=MappingProxyType(merged))
+            self._mailbox[snapshot.motor_id] = snapshot
+        if previous is None:
+            self.snapshot_ready.emit(snapshot.motor_id)
@@ -0,0 +1,210 @@
+"""
+Incremental sliding-window spectrum of a single telemetry stream.
+
+Samples from `MotorNTClient.read_motor_samples` are pushed as they arrive
+and resampled onto an even grid at the stream's sample rate, holding the
+last value, so gaps left by values NT did not re-send (publishers without
+keepDuplicates drop repeats) do not shift the frequency axis. Every `hop`
+grid samples a Hann-windowed frame of `window_size` samples is
+transformed and folded into an exponentially averaged power spectrum
+(Welch-style overlapping windows), so each UI frame costs at most one small
+real FFT per stream regardless of how long the motor has been running.
+All arrays are allocated once up front and reused.
+"""
+
+from __future__ import annotations
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SlidingSpectrum:
+    """Running power spectrum over overlapping windows.
+
+    Usage:
+        spectrum = SlidingSpectrum(window_size=256, hop=64)
+        spectrum.push(samples)  # [(timestamp_seconds, value), ...]
+        freqs, power_db = spectrum.frequencies(), spectrum.power_db()
+    """
+
+    def __init__(
+        self,
+        window_size: int = 256,
+        hop: int = 64,
+        averaging: float = 0.3,
+        sample_rate: float = 50.0,
+    ):
+        if window_size < 4 or hop < 1 or hop > window_size:
+            raise ValueError("window_size must be >= 4 and 1 <= hop <= window_size")
+        self.window_size = window_size
+        self.hop = hop
+        self.averaging = averaging
+        self.sample_rate = sample_rate
+
+        # Samples are written twice (at i and i + n) so the latest window is
+        # always one contiguous slice and never needs to be unrolled
+        self._ring = np.zeros(2 * window_size)
+        self._pos = 0
+        self._filled = 0
+        self._pending = 0
+        self._last_time: Optional[float] = None
+        # Next grid time to fill and the value held until the next sample
+        self._grid_time: Optional[float] = None
+        self._held = 0.0
+        # Recent sample gaps for the rate estimate; a single batch is often
+        # only one or two samples
+        self._gaps = np.zeros(window_size)
+        self._gap_pos = 0
+        self._gap_count = 0
+
+        self._window = np.hanning(window_size)
+        # Normalize so a full-scale sine has the same power at any window size
+        self._scale = 2.0 / float(self._window.sum()) ** 2
+        self._frame = np.empty(window_size)
+        self._spectrum = np.empty(window_size // 2 + 1, dtype=complex)
+        self._magnitude = np.empty(window_size // 2 + 1)
+        self._power = np.zeros(window_size // 2 + 1)
+        self._power_db = np.empty(window_size // 2 + 1)
+        self._freqs: Optional[np.ndarray] = None
+        self.frame_count = 0
+
+    def reset(self) -> None:
+        self._pos = 0
+        self._filled = 0
+        self._pending = 0
+        self._last_time = None
+        self._grid_time = None
+        self._gap_pos = 0
+        self._gap_count = 0
+        self._power.fill(0.0)
+        self.frame_count = 0
+
+    def push(self, samples: Sequence[Tuple[float, float]]) -> bool:
+        """Add (timestamp_seconds, value) samples. Returns True if the
+        averaged spectrum changed."""
+        if len(samples) == 0:
+            return False
+        data = np.asarray(samples, dtype=float).reshape(-1, 2)
+        if self._last_time is not None:
+            # Already-seen or replayed samples would step the grid backwards
+            data = data[data[:, 0] > self._last_time]
+            if len(data) == 0:
+                return False
+        self._update_sample_rate(data[:, 0])
+        values, skipped = self._resample(data[:, 0], data[:, 1])
+        if len(values) == 0:
+            return False
+
+        n = self.window_size
+        # Samples older than one window can never be part of a frame
+        if len(values) > n:
+            skipped += len(values) - n
+            values = values[-n:]
+        if skipped:
+            self._pos = (self._pos + skipped) % n
+            self._pending += skipped
+        index = (self._pos + np.arange(len(values))) % n
+        self._ring[index] = values
+        self._ring[index + n] = values
+        self._pos = (self._pos + len(values)) % n
+        self._filled = min(n, self._filled + len(values))
+        self._pending += len(values)
+
+        if self._filled < n or self._pending < self.hop:
+            return False
+        # If several hops piled up, only the newest frame is worth computing
+        self._pending %= self.hop
+        self._compute_frame()
+        return True
+
+    def _resample(
+        self, times: np.ndarray, values: np.ndarray
+    ) -> Tuple[np.ndarray, int]:
+        """Zero-order hold onto the grid up to the newest sample time.
+
+        Returns the grid values and how many older grid points were skipped
+        because they could not fit in one window anyway.
+        """
+        period = 1.0 / self.sample_rate
+        if self._grid_time is None:
+            self._grid_time = float(times[0])
+        count = int(np.floor((times[-1] - self._grid_time) / period + 1e-6)) + 1
+        skipped = 0
+        if count > self.window_size:
+            skipped = count - self.window_size
+            self._grid_time += skipped * period
+            count = self.window_size
+        if count <= 0:
+            self._held = float(values[-1])
+            return np.empty(0), 0
+        grid = self._grid_time + period * np.arange(count)
+        index = np.searchsorted(times, grid + 1e-6, side="right") - 1
+        out = np.where(index >= 0, values[np.maximum(index, 0)], self._held)
+        self._grid_time = float(grid[-1]) + period
+        self._held = float(values[-1])
+        return out, skipped
+
+    def _update_sample_rate(self, times: np.ndarray) -> None:
+        if self._last_time is not None:
+            times = np.concatenate(([self._last_time], times))
+        self._last_time = float(times[-1])
+        if len(times) < 2:
+            return
+        dt = np.diff(times)
+        dt = dt[dt > 0][-len(self._gaps) :]
+        if len(dt) == 0:
+            return
+        index = (self._gap_pos + np.arange(len(dt))) % len(self._gaps)
+        self._gaps[index] = dt
+        self._gap_pos = (self._gap_pos + len(dt)) % len(self._gaps)
+        self._gap_count = min(len(self._gaps), self._gap_count + len(dt))
+        if self._gap_count < 8:
+            return
+        dt = self._gaps[: self._gap_count]
+        # Dropped repeats only lengthen gaps, to whole multiples of the true
+        # period: take a short gap as a first guess, then count the periods
+        # each gap spans and average over all of them
+        guess = float(np.percentile(dt, 25))
+        periods = np.maximum(1.0, np.round(dt / guess))
+        rate = float(periods.sum() / dt.sum())
+        if abs(rate - self.sample_rate) > 0.05 * self.sample_rate:
+            self.sample_rate = rate
+            self._freqs = None
+
+    def _compute_frame(self) -> None:
+        window = self._ring[self._pos : self._pos + self.window_size]
+        # Remove DC so the mean value does not leak into the lowest bins
+        np.subtract(window, window.mean(), out=self._frame)
+        self._frame *= self._window
+        np.fft.rfft(self._frame, out=self._spectrum)
+        np.abs(self._spectrum, out=self._magnitude)
+        self._magnitude *= self._magnitude
+        self._magnitude *= self._scale
+        if self.frame_count == 0:
+            self._power[:] = self._magnitude
+        else:
+            self._power *= 1.0 - self.averaging
+            self._magnitude *= self.averaging
+            self._power += self._magnitude
+        self.frame_count += 1
+
+    def frequencies(self) -> np.ndarray:
+        if self._freqs is None:
+            self._freqs = np.fft.rfftfreq(self.window_size, 1.0 / self.sample_rate)
+        return self._freqs
+
+    def power(self) -> np.ndarray:
+        return self._power
+
+    def power_db(self) -> np.ndarray:
+        np.maximum(self._power, 1e-12, out=self._power_db)
+        np.log10(self._power_db, out=self._power_db)
+        self._power_db *= 10.0
+        return self._power_db
+
+    def peak(self) -> Optional[Tuple[float, float]]:
+        """Strongest non-DC bin as (frequency_hz, power)."""
+        if self.frame_count == 0:
+            return None
+        index = int(np.argmax(self._power[1:])) + 1
+        return float(self.frequencies()[index]), float(self._power[index])
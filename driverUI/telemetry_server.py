@@ -0,0 +1,356 @@
+"""
+Local telemetry fan-out service.
+
+Holds the single NT connection to the robot (through `MotorNTClient`) and
+rebroadcasts telemetry to any number of local viewers (extra driverUI
+windows, scripts, notebooks) over a TCP socket, so the robot's NT server
+only ever sees one client no matter how many laptops are watching.
+
+Run it next to the UI:
+
+  python telemetry_server.py --server 10.TE.AM.2 --listen-port 5811
+  NT_FANOUT=127.0.0.1:5811 python main.py
+
+Protocol: newline-delimited JSON in both directions.
+
+Viewer -> server
+  {"op": "hello", "rate": 20, "motors": [1, 2]}   max batches/s, motor filter
+  {"op": "cmd", "id": 1, "kind": "speed", "value": 0.5, "seq": 123}
+
+Server -> viewer, at most `rate` times per second
+  {"stats": {"1": {"velocity": 512.0}},       latest values, changed fields only
+   "acks": {"1": 123},                         own acked seq, changed only
+   "samples": {"1": {"velocity": {"t0": 12.5, "dt": [20000, 20010],
+                                  "v": [510.0, 511.2, 512.0]}}}}
+
+The first batch a viewer receives carries every field; after that only
+fields that changed since that viewer's previous batch are sent. Sample
+timestamps are sent as a start time in seconds plus integer microsecond
+deltas.
+
+Sequence numbers on the robot belong to the server: every forwarded command
+is published with a server-assigned seq, and the viewer's own seq is only
+remembered so the robot's ackSeq can be translated back. A viewer is only
+ever sent acks for commands it sent, in its own numbering (0 before its
+first one is acknowledged), so viewers never see each other's
+acknowledgements.
+
+A viewer that stops reading is disconnected once its socket buffer or its
+backlog of unsent samples grows past a limit, so one slow consumer never
+holds up the others or grows the server's memory.
+"""
+
+from __future__ import annotations
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import argparse
+import asyncio
+import json
+import time
+
+from command_tracker import COMMAND_KINDS
+
+DEFAULT_LISTEN_PORT = 5811
+# Per-viewer limits before it is considered a slow consumer
+MAX_WRITE_BUFFER = 1 << 20  # bytes queued in the socket
+MAX_PENDING_SAMPLES = 5000  # samples per field waiting for the next batch
+# Forwarded commands per motor still waiting for the robot's ackSeq
+MAX_OUTSTANDING_COMMANDS = 1000
+
+
+def encode_samples(samples: Sequence[Tuple[float, float]]) -> Dict[str, Any]:
+    """Encode [(t, v), ...] as a start time plus microsecond deltas."""
+    times = [t for t, _ in samples]
+    micros = [round(t * 1e6) for t in times]
+    return {
+        "t0": times[0],
+        "dt": [b - a for a, b in zip(micros, micros[1:])],
+        "v": [v for _, v in samples],
+    }
+
+
+def decode_samples(encoded: Dict[str, Any]) -> List[Tuple[float, float]]:
+    t = float(encoded["t0"])
+    values = encoded["v"]
+    if not values:
+        return []
+    out = [(t, float(values[0]))]
+    for delta, value in zip(encoded["dt"], values[1:]):
+        t += delta / 1e6
+        out.append((t, float(value)))
+    return out
+
+
+class _Viewer:
+    """Per-connection state: rate limit, delta baseline and backlog."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.rate = 20.0
+        self.motors: Optional[set] = None  # None = every motor
+        self.next_send = 0.0
+        self.sent_stats: Dict[int, Dict[str, float]] = {}
+        self.acks: Dict[int, int] = {}  # newest acked seq, viewer numbering
+        self.sent_acks: Dict[int, int] = {}
+        self.pending_samples: Dict[int, Dict[str, List[Tuple[float, float]]]] = {}
+
+    def wants(self, motor_id: int) -> bool:
+        return self.motors is None or motor_id in self.motors
+
+    def queue_samples(
+        self, motor_id: int, samples: Dict[str, List[Tuple[float, float]]]
+    ) -> bool:
+        """Add samples to the backlog; returns False if the viewer is too far
+        behind and should be dropped."""
+        pending = self.pending_samples.setdefault(motor_id, {})
+        for key, values in samples.items():
+            if not values:
+                continue
+            backlog = pending.setdefault(key, [])
+            backlog.extend(values)
+            if len(backlog) > MAX_PENDING_SAMPLES:
+                return False
+        return True
+
+
+class TelemetryFanoutServer:
+    """Polls one `MotorNTClient` and fans the results out to viewers."""
+
+    def __init__(
+        self,
+        client,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_LISTEN_PORT,
+        poll_interval: float = 0.02,
+        discover_interval: float = 1.0,
+    ):
+        self._client = client
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.discover_interval = discover_interval
+        self._viewers: Dict[asyncio.StreamWriter, _Viewer] = {}
+        self._motor_ids: List[int] = []
+        self._stats: Dict[int, Dict[str, float]] = {}
+        # Seeded like CommandTracker so a restarted server never reuses a
+        # sequence number the robot has already acknowledged
+        self._next_seq = int(time.time() * 1e6)
+        # motor id -> [(server seq, viewer, viewer seq)] in send order
+        self._outstanding: Dict[int, List[Tuple[int, _Viewer, int]]] = {}
+
+    async def serve(self) -> None:
+        self._client.start()
+        server = await asyncio.start_server(self._on_connect, self.host, self.port)
+        print(f"Telemetry fan-out listening on {self.host}:{self.port}")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self._poll_loop())
+
+    # ------------------------ robot side ------------------------
+    async def _poll_loop(self) -> None:
+        next_discover = 0.0
+        next_poll = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now >= next_discover:
+                try:
+                    self._motor_ids = self._client.list_motor_ids()
+                except Exception:
+                    pass
+                next_discover = now + self.discover_interval
+            self._poll_once(now)
+            # Absolute deadlines so the poll rate does not drift
+            next_poll += self.poll_interval
+            if next_poll < now:
+                next_poll = now + self.poll_interval
+            await asyncio.sleep(max(0.0, next_poll - time.monotonic()))
+
+    def _poll_once(self, now: float) -> None:
+        # One set of NT reads per poll, shared by every viewer
+        fresh_samples: Dict[int, Dict[str, List[Tuple[float, float]]]] = {}
+        # Motors a viewer asked for by id are polled even before discovery
+        # lists them
+        motor_ids = set(self._motor_ids)
+        for viewer in self._viewers.values():
+            if viewer.motors is not None:
+                motor_ids |= viewer.motors
+        for motor_id in sorted(motor_ids):
+            try:
+                data = self._client.get_motor_data(motor_id)
+                fresh_samples[motor_id] = self._client.read_motor_samples(motor_id)
+                ack = self._client.get_ack_seq(motor_id)
+            except Exception:
+                continue
+            self._stats[motor_id] = asdict(data)
+            if ack is not None:
+                self._route_ack(motor_id, ack)
+
+        for viewer in list(self._viewers.values()):
+            for motor_id, samples in fresh_samples.items():
+                if viewer.wants(motor_id) and not viewer.queue_samples(
+                    motor_id, samples
+                ):
+                    self._drop(viewer, "sample backlog")
+                    break
+            else:
+                if now >= viewer.next_send:
+                    self._send_batch(viewer)
+                    viewer.next_send = now + 1.0 / viewer.rate
+
+    def _route_ack(self, motor_id: int, ack: int) -> None:
+        """Credit the robot's ackSeq to the viewers whose commands it covers."""
+        # 0 tells a viewer the robot acknowledges commands on this motor, so it
+        # waits for acks instead of inferring them before its first one
+        for viewer in self._viewers.values():
+            if viewer.wants(motor_id):
+                viewer.acks.setdefault(motor_id, 0)
+        outstanding = self._outstanding.get(motor_id)
+        if not outstanding:
+            return
+        # Sent in seq order, so everything acknowledged is at the front
+        count = 0
+        for server_seq, viewer, viewer_seq in outstanding:
+            if server_seq > ack:
+                break
+            count += 1
+            if viewer_seq > viewer.acks.get(motor_id, -1):
+                viewer.acks[motor_id] = viewer_seq
+        del outstanding[:count]
+
+    def _send_batch(self, viewer: _Viewer) -> None:
+        batch: Dict[str, Dict[str, Any]] = {"stats": {}, "acks": {}, "samples": {}}
+        for motor_id, stats in self._stats.items():
+            if not viewer.wants(motor_id):
+                continue
+            sent = viewer.sent_stats.setdefault(motor_id, {})
+            changed = {k: v for k, v in stats.items() if sent.get(k) != v}
+            if changed:
+                batch["stats"][str(motor_id)] = changed
+                sent.update(changed)
+        for motor_id, ack in viewer.acks.items():
+            if viewer.sent_acks.get(motor_id) != ack:
+                batch["acks"][str(motor_id)] = ack
+                viewer.sent_acks[motor_id] = ack
+        for motor_id, pending in viewer.pending_samples.items():
+            encoded = {key: encode_samples(v) for key, v in pending.items() if v}
+            if encoded:
+                batch["samples"][str(motor_id)] = encoded
+        viewer.pending_samples.clear()
+
+        batch = {key: value for key, value in batch.items() if value}
+        if not batch:
+            return
+        writer = viewer.writer
+        writer.write(json.dumps(batch, separators=(",", ":")).encode() + b"\n")
+        if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self._drop(viewer, "write buffer full")
+
+    # ------------------------ viewer side ------------------------
+    async def _on_connect(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        viewer = _Viewer(writer)
+        self._viewers[writer] = viewer
+        peer = writer.get_extra_info("peername")
+        print(f"Viewer connected: {peer}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict):
+                    self._handle_message(viewer, message)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._forget(viewer)
+            writer.close()
+            print(f"Viewer disconnected: {peer}")
+
+    def _handle_message(self, viewer: _Viewer, message: Dict[str, Any]) -> None:
+        op = message.get("op")
+        if op == "hello":
+            try:
+                rate = min(100.0, max(0.5, float(message.get("rate", 20))))
+                motors = message.get("motors")
+                motors = set(int(m) for m in motors) if motors else None
+            except (TypeError, ValueError):
+                return
+            viewer.rate = rate
+            viewer.motors = motors
+            # Resend everything as a keyframe for the new filter
+            viewer.sent_stats.clear()
+            viewer.sent_acks.clear()
+        elif op == "cmd":
+            self._forward_command(viewer, message)
+
+    def _forward_command(self, viewer: _Viewer, message: Dict[str, Any]) -> None:
+        try:
+            motor_id = int(message["id"])
+            kind = str(message["kind"])
+            value = float(message.get("value", 0.0))
+            viewer_seq = message.get("seq")
+            viewer_seq = int(viewer_seq) if viewer_seq is not None else None
+        except (KeyError, TypeError, ValueError):
+            return
+        if kind not in COMMAND_KINDS:
+            return
+        seq = self._next_seq
+        self._next_seq += 1
+        if viewer_seq is not None:
+            outstanding = self._outstanding.setdefault(motor_id, [])
+            outstanding.append((seq, viewer, viewer_seq))
+            # The robot may not publish ackSeq at all; keep the newest only
+            del outstanding[:-MAX_OUTSTANDING_COMMANDS]
+        if kind == "speed":
+            self._client.set_speed(motor_id, value, seq=seq)
+        elif kind == "position":
+            self._client.set_position(motor_id, value, seq=seq)
+        elif kind == "stop":
+            self._client.stop(motor_id, seq=seq)
+        elif kind == "reset":
+            self._client.reset(motor_id, seq=seq)
+
+    def _drop(self, viewer: _Viewer, reason: str) -> None:
+        peer = viewer.writer.get_extra_info("peername")
+        print(f"Dropping slow viewer {peer}: {reason}")
+        self._forget(viewer)
+        viewer.writer.transport.abort()
+
+    def _forget(self, viewer: _Viewer) -> None:
+        self._viewers.pop(viewer.writer, None)
+        for outstanding in self._outstanding.values():
+            outstanding[:] = [entry for entry in outstanding if entry[1] is not viewer]
+
+
+def main() -> None:
+    from test import MotorNTClient
+
+    parser = argparse.ArgumentParser(description="Local telemetry fan-out service")
+    parser.add_argument("--server", help="NT server hostname/IP (default localhost)")
+    parser.add_argument("--team", type=int, help="team number for DS discovery")
+    parser.add_argument("--port", type=int, help="NT server port")
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--listen-port", type=int, default=DEFAULT_LISTEN_PORT)
+    args = parser.parse_args()
+
+    client = MotorNTClient(
+        server=args.server,
+        team=args.team,
+        port=args.port,
+        client_name="DriverUIFanout",
+    )
+    server = TelemetryFanoutServer(client, args.listen_host, args.listen_port)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.stop_client()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,28 @@ Motor NT client library using ntcore (WPILib NT4).
 Provides a simple interface to read motor stats and issue commands
 (speed, position, stop, reset) against the following NetworkTables layout:
 
-  MotorStats/<id>/{busVoltage, outputCurrent, temperature, velocity, setSpeed, position}
-  MotorController/<id>/{desiredSpeed, newPosition, stop, reset}
+  MotorStats/<id>/{busVoltage, outputCurrent, temperature, velocity, setSpeed, position, ackSeq}
+  MotorController/<id>/{desiredSpeed, newPosition, stop, reset, seq}
+
+Commands may carry a sequence number on `seq`; the robot echoes the newest
+sequence number it has applied on `ackSeq`.
 
 Tested against the API documented in RobotPy ntcore.
 """
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
-from ntcore import NetworkTableInstance
+from typing import Dict, Any, List, Optional, Tuple
+from ntcore import MultiSubscriber, NetworkTableInstance, PubSubOptions, _now
+
+STATS_FIELDS = (
+    "busVoltage",
+    "outputCurrent",
+    "temperature",
+    "velocity",
+    "setSpeed",
+    "position",
+)
 
 
 @dataclass
@@ -46,6 +58,7 @@ class MotorNTClient:
         team: Optional[int] = None,
         port: Optional[int] = None,
         client_name: str = "DriverUI",
+        sample_storage: int = 1024,
     ):
         self.inst = NetworkTableInstance.getDefault()
         self.server = server
@@ -56,11 +69,17 @@ class MotorNTClient:
             else getattr(NetworkTableInstance, "kDefaultPort4", 5810)
         )
         self.client_name = client_name
+        self.sample_storage = sample_storage
         self._started = False
 
         # Cache topic subscribers (stats) and publishers (commands) per motor id
         self._stats_subs: Dict[int, Dict[str, Any]] = {}
+        self._sample_subs: Dict[int, Dict[str, Any]] = {}
         self._cmd_pubs: Dict[int, Dict[str, Any]] = {}
+        self._ack_subs: Dict[int, Any] = {}
+        # Topic announcements under /MotorStats/, so list_motor_ids sees motors
+        # nothing has subscribed to yet
+        self._discovery: Optional[MultiSubscriber] = None
 
     # ------------------------ lifecycle ------------------------
     def start(self) -> None:
@@ -84,6 +103,14 @@ class MotorNTClient:
             self.inst.startClient4(self.client_name)
             self.inst.setServer(["127.0.0.1"], self.port)
 
+        if self._discovery is None:
+            # Topic names are absolute ("/MotorStats/1/..."), so the prefix
+            # must carry the leading slash to match anything
+            prefix = self.inst.getTable("MotorStats").getPath() + "/"
+            self._discovery = MultiSubscriber(
+                self.inst, [prefix], PubSubOptions(topicsOnly=True)
+            )
+
     def stop_client(self) -> None:
         self.inst.stopClient()
         self._started = False
@@ -105,16 +132,38 @@ class MotorNTClient:
         self._stats_subs[motor_id] = subs
         return subs
 
+    def _ensure_sample_subs(self, motor_id: int) -> Dict[str, Any]:
+        subs = self._sample_subs.get(motor_id)
+        if subs is not None:
+            return subs
+        # Queue every published value (not just the latest) so fits and spectra
+        # see the full robot loop rate instead of the UI poll rate
+        options = PubSubOptions(
+            sendAll=True, keepDuplicates=True, pollStorage=self.sample_storage
+        )
+        stats = self.inst.getTable("MotorStats").getSubTable(str(motor_id))
+        subs = {
+            key: stats.getDoubleTopic(key).subscribe(0.0, options)
+            for key in STATS_FIELDS
+        }
+        self._sample_subs[motor_id] = subs
+        return subs
+
     def _ensure_cmd_pubs(self, motor_id: int) -> Dict[str, Any]:
         pubs = self._cmd_pubs.get(motor_id)
         if pubs is not None:
             return pubs
         cmds = self.inst.getTable("MotorController").getSubTable(str(motor_id))
+        # keepDuplicates so a retried command is sent again even if unchanged;
+        # a 5 ms period instead of NT's 100 ms default keeps batching out of
+        # the command latency
+        options = PubSubOptions(keepDuplicates=True, periodic=0.005)
         pubs = {
-            "desiredSpeed": cmds.getDoubleTopic("desiredSpeed").publish(),
-            "newPosition": cmds.getDoubleTopic("newPosition").publish(),
-            "stop": cmds.getBooleanTopic("stop").publish(),
-            "reset": cmds.getBooleanTopic("reset").publish(),
+            "desiredSpeed": cmds.getDoubleTopic("desiredSpeed").publish(options),
+            "newPosition": cmds.getDoubleTopic("newPosition").publish(options),
+            "stop": cmds.getBooleanTopic("stop").publish(options),
+            "reset": cmds.getBooleanTopic("reset").publish(options),
+            "seq": cmds.getIntegerTopic("seq").publish(options),
         }
         # Initialize command defaults expected by the Java side
         pubs["desiredSpeed"].set(0.0)
@@ -141,30 +190,90 @@ class MotorNTClient:
             position=float(subs["position"].get()),
         )
 
+    def read_motor_samples(self, motor_id: int) -> Dict[str, List[Tuple[float, float]]]:
+        """Drain every stats sample received since the previous call.
+
+        Returns a dict keyed like MotorData fields; each value is a list of
+        (timestamp_seconds, value) tuples in arrival order. The first call only
+        sets up the queues and usually returns empty lists.
+        """
+        subs = self._ensure_sample_subs(motor_id)
+        return {
+            key: [(s.time / 1e6, float(s.value)) for s in sub.readQueue()]
+            for key, sub in subs.items()
+        }
+
+    def now(self) -> float:
+        """Current NT clock in seconds, the time base of `read_motor_samples`."""
+        return _now() / 1e6
+
+    def list_motor_ids(self) -> List[int]:
+        """Motor ids the robot currently publishes under MotorStats."""
+        ids = []
+        for name in self.inst.getTable("MotorStats").getSubTables():
+            try:
+                ids.append(int(name))
+            except ValueError:
+                continue
+        return sorted(ids)
+
+    def get_ack_seq(self, motor_id: int) -> Optional[int]:
+        """Newest command sequence number the robot has applied, or None if
+        the robot code does not publish `ackSeq`."""
+        sub = self._ack_subs.get(motor_id)
+        if sub is None:
+            stats = self.inst.getTable("MotorStats").getSubTable(str(motor_id))
+            sub = stats.getIntegerTopic("ackSeq").subscribe(
+                -1, PubSubOptions(periodic=0.005)
+            )
+            self._ack_subs[motor_id] = sub
+        if not sub.exists():
+            return None
+        value = int(sub.get())
+        return value if value >= 0 else None
+
     # ------------------------ commands ------------------------
-    def set_speed(self, motor_id: int, percent_output: float) -> None:
+    # `seq` is published after the command value so the robot never sees a
+    # sequence number before the command it belongs to.
+    def set_speed(
+        self, motor_id: int, percent_output: float, seq: Optional[int] = None
+    ) -> None:
         """Command motor to a percent output in range [-1.0, 1.0]."""
         pubs = self._ensure_cmd_pubs(motor_id)
         pubs["stop"].set(False)
         v = float(percent_output)
         pubs["desiredSpeed"].set(v)
+        if seq is not None:
+            pubs["seq"].set(int(seq))
+        self.inst.flush()
 
-    def set_position(self, motor_id: int, rotations: float) -> None:
+    def set_position(
+        self, motor_id: int, rotations: float, seq: Optional[int] = None
+    ) -> None:
         """Command motor to an absolute position in *rotations*."""
         pubs = self._ensure_cmd_pubs(motor_id)
         pubs["reset"].set(False)
         pubs["newPosition"].set(float(rotations))
+        if seq is not None:
+            pubs["seq"].set(int(seq))
+        self.inst.flush()
 
-    def stop(self, motor_id: int) -> None:
+    def stop(self, motor_id: int, seq: Optional[int] = None) -> None:
         """Issue a one-shot stop command."""
         pubs = self._ensure_cmd_pubs(motor_id)
         pubs["stop"].set(True)
+        if seq is not None:
+            pubs["seq"].set(int(seq))
+        self.inst.flush()
         print("stop")
 
-    def reset(self, motor_id: int) -> None:
+    def reset(self, motor_id: int, seq: Optional[int] = None) -> None:
         """Request a position reset (to 0 rotations)."""
         pubs = self._ensure_cmd_pubs(motor_id)
         pubs["reset"].set(True)
+        if seq is not None:
+            pubs["seq"].set(int(seq))
+        self.inst.flush()
         print("reset")
 
 
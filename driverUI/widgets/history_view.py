@@ -0,0 +1,131 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QComboBox,
+    QSizePolicy,
+)
+from PySide6.QtGui import QPainter, QPen, QColor, QPolygonF, QBrush
+from PySide6.QtCore import Qt, QPointF, QRectF
+
+from typing import Optional
+
+import numpy as np
+
+from history import HistorySlice, MotorHistory
+
+
+class _HistoryPlot(QWidget):
+    """Min/max envelope with the mean drawn on top."""
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self._slice: Optional[HistorySlice] = None
+        self._t0 = 0.0
+        self._t1 = 1.0
+
+    def set_slice(self, data: HistorySlice, t0: float, t1: float):
+        self._slice = data
+        self._t0 = t0
+        self._t1 = t1
+        self.update()
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(4, 4, max(1, self.width() - 8), max(1, self.height() - 20))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        rect = self._plot_rect()
+        painter.setPen(QPen(QColor("#4B4B4B"), 1))
+        painter.drawRect(rect)
+
+        data = self._slice
+        if data is None or len(data.times) == 0:
+            painter.drawText(rect, Qt.AlignCenter, "No data yet")
+            painter.end()
+            return
+
+        low = float(np.min(data.mins))
+        high = float(np.max(data.maxs))
+        if high - low < 1e-9:
+            low -= 0.5
+            high += 0.5
+        span = max(self._t1 - self._t0, 1e-9)
+        xs = rect.left() + (data.times - self._t0) / span * rect.width()
+
+        def to_y(values):
+            return rect.bottom() - (values - low) / (high - low) * rect.height()
+
+        if data.bucket_width > 0:
+            upper = [QPointF(float(x), float(y)) for x, y in zip(xs, to_y(data.maxs))]
+            lower = [QPointF(float(x), float(y)) for x, y in zip(xs, to_y(data.mins))]
+            envelope = QPolygonF(upper + lower[::-1])
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QBrush(QColor(79, 157, 222, 70)))
+            painter.drawPolygon(envelope)
+            painter.setBrush(Qt.NoBrush)
+
+        mean = QPolygonF(
+            [QPointF(float(x), float(y)) for x, y in zip(xs, to_y(data.means))]
+        )
+        painter.setPen(QPen(QColor("#4F9DDE"), 1.2))
+        painter.drawPolyline(mean)
+
+        painter.setPen(QPen(QColor("#8A8A8A"), 1))
+        resolution = (
+            "raw" if data.bucket_width == 0 else f"{data.bucket_width:g} s buckets"
+        )
+        painter.drawText(
+            QPointF(rect.left(), self.height() - 3),
+            f"{low:.2f} .. {high:.2f}  ({resolution})",
+        )
+        painter.end()
+
+
+class HistoryView(QWidget):
+    """Zoomable trend of one stats field, rendered from a `MotorHistory`."""
+
+    SPANS = {
+        "10 s": 10.0,
+        "30 s": 30.0,
+        "1 min": 60.0,
+        "10 min": 600.0,
+        "1 hour": 3600.0,
+        "6 hours": 6 * 3600.0,
+        "24 hours": 24 * 3600.0,
+    }
+
+    def __init__(self, history: MotorHistory, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self._history = history
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        controls = QHBoxLayout()
+        self.field_combo = QComboBox()
+        self.field_combo.addItems(history.fields())
+        self.span_combo = QComboBox()
+        self.span_combo.addItems(list(self.SPANS))
+        self.span_combo.setCurrentText("1 min")
+        controls.addWidget(self.field_combo)
+        controls.addWidget(self.span_combo)
+        layout.addLayout(controls)
+        self._plot = _HistoryPlot()
+        layout.addWidget(self._plot)
+
+        self.field_combo.currentTextChanged.connect(self.refresh)
+        self.span_combo.currentTextChanged.connect(self.refresh)
+
+    def refresh(self):
+        latest = self._history.latest_time()
+        key = self.field_combo.currentText()
+        if latest is None or not key:
+            return
+        span = self.SPANS[self.span_combo.currentText()]
+        t0 = latest - span
+        # One point per pixel is all the plot can show
+        data = self._history.query(key, t0, latest, max(50, self._plot.width()))
+        self._plot.set_slice(data, t0, latest)
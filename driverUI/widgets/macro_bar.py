@@ -0,0 +1,196 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QDoubleSpinBox,
+    QFileDialog,
+)
+from PySide6.QtCore import Qt
+
+from typing import List, Optional
+
+from macros import (
+    MacroEvent,
+    MacroPlayer,
+    MacroRecorder,
+    load_macro,
+    retarget,
+    save_macro,
+)
+
+
+class MacroBar(QWidget):
+    """Record operator commands from every motor card and replay them."""
+
+    def __init__(self, nt_worker: Optional[object] = None):
+        super().__init__()
+        self._nt = nt_worker
+        self._recorder = MacroRecorder()
+        self._events: List[MacroEvent] = []
+        # Cleared by the player's finished signal, not by thread state, so the
+        # buttons only change once the final status has been delivered
+        self._playing = False
+        self._player = MacroPlayer(self._send, parent=self)
+        self._player.progress.connect(self._on_progress)
+        self._player.finished.connect(self._on_finished)
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.record_button = QPushButton("Record Macro")
+        self.record_button.setCheckable(True)
+        self.play_button = QPushButton("Play")
+        self.targets_input = QLineEdit()
+        self.targets_input.setPlaceholderText(
+            "Target IDs, e.g. 1,3 (blank = recorded)"
+        )
+        self.targets_input.setStyleSheet("padding: 5px;")
+        time_scale_label = QLabel("Time Scale:")
+        self.time_scale_spin = QDoubleSpinBox()
+        self.time_scale_spin.setRange(0.1, 10.0)
+        self.time_scale_spin.setSingleStep(0.1)
+        self.time_scale_spin.setValue(1.0)
+        self.save_button = QPushButton("Save")
+        self.load_button = QPushButton("Load")
+        self.status_label = QLabel("No macro")
+
+        layout.addWidget(self.record_button)
+        layout.addWidget(self.play_button)
+        layout.addWidget(self.targets_input, 1)
+        layout.addWidget(time_scale_label)
+        layout.addWidget(self.time_scale_spin)
+        layout.addWidget(self.save_button)
+        layout.addWidget(self.load_button)
+        layout.addWidget(self.status_label)
+        layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
+
+        self.record_button.toggled.connect(self._on_record_toggled)
+        self.play_button.clicked.connect(self._on_play_clicked)
+        self.save_button.clicked.connect(self._on_save_clicked)
+        self.load_button.clicked.connect(self._on_load_clicked)
+        self._update_buttons()
+
+    def record(self, motor_id, kind, value, timestamp):
+        """Slot for MotorDisplay.operator_command."""
+        # An operator Stop always wins over a running macro
+        if kind == "stop" and self._playing:
+            self._player.stop()
+        if self._recorder.is_recording():
+            self._recorder.record(motor_id, kind, value, timestamp)
+
+    def _send(self, motor_id, kind, value):
+        # Called from the player thread; NTWorker.send only enqueues
+        if self._nt is not None:
+            self._nt.send(motor_id, kind, value)
+
+    def _update_buttons(self):
+        playing = self._playing
+        recording = self._recorder.is_recording()
+        self.record_button.setEnabled(not playing)
+        self.play_button.setText("Stop" if playing else "Play")
+        self.play_button.setEnabled(playing or (bool(self._events) and not recording))
+        self.save_button.setEnabled(bool(self._events) and not recording)
+        self.load_button.setEnabled(not playing and not recording)
+
+    def _on_record_toggled(self, checked):
+        if checked:
+            self._recorder.start()
+            self.record_button.setText("Stop Recording")
+            self.status_label.setText("Recording...")
+        else:
+            self._events = self._recorder.stop()
+            self.record_button.setText("Record Macro")
+            self._show_summary()
+        self._update_buttons()
+
+    def _show_summary(self):
+        if not self._events:
+            self.status_label.setText("No macro")
+            return
+        length = self._events[-1].offset
+        self.status_label.setText(f"{len(self._events)} commands, {length:.2f} s")
+
+    def _parse_targets(self):
+        text = self.targets_input.text().strip()
+        if not text:
+            return None
+        # Raises ValueError on anything that is not a list of integers
+        targets = [int(part) for part in text.replace(" ", ",").split(",") if part]
+        return targets or None
+
+    def _on_play_clicked(self):
+        if self._playing:
+            self._player.stop()
+            return
+        if not self._events or self._nt is None:
+            return
+        try:
+            targets = self._parse_targets()
+        except ValueError:
+            self.status_label.setText("Invalid target IDs")
+            return
+        try:
+            if targets:
+                mapping = retarget(self._events, targets)
+                driven = {m for ids in mapping.values() for m in ids}
+            else:
+                driven = {event.motor_id for event in self._events}
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        busy = sorted(m for m in driven if self._nt.is_sweeping(m))
+        if busy:
+            # A macro would fight the sweep's speed commands
+            ids = ", ".join(str(m) for m in busy)
+            self.status_label.setText(f"Motor {ids} is being characterized")
+            return
+        try:
+            started = self._player.play(
+                self._events, targets, self.time_scale_spin.value()
+            )
+        except ValueError as e:
+            self.status_label.setText(str(e))
+            return
+        if not started:
+            return
+        self._playing = True
+        self.status_label.setText("Playing...")
+        self._update_buttons()
+
+    def _on_progress(self, sent, total):
+        self.status_label.setText(f"Playing {sent}/{total}")
+
+    def _on_finished(self, worst_late, completed):
+        self._playing = False
+        state = "Done" if completed else "Stopped"
+        self.status_label.setText(
+            f"{state}, worst lateness {worst_late * 1000:.2f} ms"
+        )
+        self._update_buttons()
+
+    def _on_save_clicked(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Macro", "macro.json", "Macro (*.json)"
+        )
+        if not path:
+            return
+        try:
+            save_macro(path, self._events)
+        except OSError as e:
+            self.status_label.setText(f"Save failed: {e}")
+
+    def _on_load_clicked(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Macro", "", "Macro (*.json)"
+        )
+        if not path:
+            return
+        try:
+            self._events = load_macro(path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.status_label.setText(f"Load failed: {e}")
+            return
+        self._show_summary()
+        self._update_buttons()
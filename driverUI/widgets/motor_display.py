@@ -11,23 +11,32 @@ from PySide6.QtWidgets import (
     QFrame,
 )
 from PySide6.QtGui import QPalette, QColor
-from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtCore import Qt, Signal
 
 from typing import Optional
+import time
 
-# Attempt to import the NT client. If not available at import time, we allow
-# passing an already-constructed client into the widget.
+from characterization import CharacterizationRoutine
+from history import MotorHistory
+from spectrum import SlidingSpectrum
+from widgets.history_view import HistoryView
+from widgets.spectrum_view import SpectrumView
+
+# The stats field names come from the NT client module; without ntcore the
+# widget still works, just without history fields.
 try:
-    from test import MotorNTClient  # adjust module name if needed
+    from test import STATS_FIELDS  # adjust module name if needed
 except Exception:  # pragma: no cover
-    MotorNTClient = None  # type: ignore
+    STATS_FIELDS = ()
 
 
 class MotorDisplay(QWidget):
     close_requested = Signal(object)
+    # motor id, command kind, value, perf_counter() timestamp of the click
+    operator_command = Signal(int, str, float, float)
 
     def __init__(
-        self, MotorType, DeviceID, encoderAttached, nt_client: Optional[object] = None
+        self, MotorType, DeviceID, encoderAttached, nt_worker: Optional[object] = None
     ):
         super().__init__()
 
@@ -50,17 +59,15 @@ class MotorDisplay(QWidget):
         )
         self.setAttribute(Qt.WA_StyledBackground, True)
 
-        # ---------------- NT client + polling setup ----------------
-        self._nt = nt_client
-        # Create a default client connected to localhost if none was provided
-        if self._nt is None and MotorNTClient is not None:
-            self._nt = MotorNTClient()
-        if getattr(self, "_nt", None) is not None:
-            try:
-                self._nt.start()
-            except Exception:
-                # If start fails, we still keep the UI functional without data
-                pass
+        # ---------------- NT worker setup ----------------
+        # All NT reads and command publishes happen on the shared worker
+        # thread; this widget only receives snapshots and queues commands.
+        self._nt = nt_worker
+        if self._nt is not None:
+            self._nt.snapshot_ready.connect(self._on_snapshot_ready)
+            self._nt.command_finished.connect(self._on_command_finished)
+            self._nt.motor_stopped.connect(self._on_motor_stopped)
+            self._nt.add_motor(int(DeviceID))
 
         # Create header, middle, and footer layouts
         header_layout = QVBoxLayout()
@@ -167,17 +174,59 @@ class MotorDisplay(QWidget):
         control_buttons_row.addWidget(self.stop_button)
         footer_layout.addLayout(control_buttons_row)
 
+        self.latency_value = QLabel("Latency: no commands yet")
+        footer_layout.addWidget(self.latency_value)
+        # Shown while a Stop or Reset has not been acknowledged by the robot
+        self.command_warning = QLabel()
+        self.command_warning.setStyleSheet("color: #E05252; font-weight: bold;")
+        self.command_warning.setWordWrap(True)
+        self.command_warning.hide()
+        footer_layout.addWidget(self.command_warning)
+        self._unacked_kind: Optional[str] = None
+
+        self.characterize_button = QPushButton("Characterize")
+        footer_layout.addWidget(self.characterize_button)
+        self.fit_value = QLabel("Fit: not run")
+        self.fit_value.setWordWrap(True)
+        footer_layout.addWidget(self.fit_value)
+
+        self.history_button = QPushButton("Show History")
+        self.history_button.setCheckable(True)
+        footer_layout.addWidget(self.history_button)
+        # History is always recorded so zooming out covers the whole session
+        self._history = MotorHistory(STATS_FIELDS)
+        self.history_view = HistoryView(self._history)
+        self.history_view.setVisible(False)
+        self._history_refreshed = 0.0
+        footer_layout.addWidget(self.history_view)
+
+        self.spectrum_button = QPushButton("Show Spectrum")
+        self.spectrum_button.setCheckable(True)
+        footer_layout.addWidget(self.spectrum_button)
+        self.spectrum_view = SpectrumView()
+        self.spectrum_view.setVisible(False)
+        footer_layout.addWidget(self.spectrum_view)
+        # Only computed while the view is open
+        self._spectra = {
+            "velocity": SlidingSpectrum(),
+            "outputCurrent": SlidingSpectrum(),
+        }
+
         # Wire UI actions
         self.desired_speed_send.clicked.connect(self._send_desired_speed)
         self.reset_position_send.clicked.connect(self._send_reset_position)
         self.stop_button.clicked.connect(self._on_stop_clicked)
         self.reset_button.clicked.connect(self._on_reset_clicked)
+        self.characterize_button.clicked.connect(self._on_characterize_clicked)
+        self.history_button.toggled.connect(self._on_history_toggled)
+        self.spectrum_button.toggled.connect(self._on_spectrum_toggled)
 
-        # Periodic polling of NetworkTables for live stats
-        self._poll_timer = QTimer(self)
-        self._poll_timer.setInterval(200)  # ms
-        self._poll_timer.timeout.connect(self._update_from_nt)
-        self._poll_timer.start()
+        self._characterization = CharacterizationRoutine(
+            self._send_raw_speed, clock=self._sample_clock, parent=self
+        )
+        self._characterization.phase_changed.connect(self._on_characterization_phase)
+        self._characterization.finished.connect(self._on_characterization_finished)
+        self._characterization.aborted.connect(self._on_characterization_aborted)
 
         # Add the three layouts to the main layout
         layout.addLayout(header_layout)
@@ -188,28 +237,45 @@ class MotorDisplay(QWidget):
 
         layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
-        # Track latched command booleans so we can clear them on the next command
-        self._stop_latched = False
-        self._reset_latched = False
-
     def _on_close_clicked(self):
-        try:
-            if hasattr(self, "_poll_timer"):
-                self._poll_timer.stop()
-        except Exception:
-            pass
+        self._detach()
         self.close_requested.emit(self)
 
-    def _update_from_nt(self):
-        """Fetch latest motor stats from NT and update labels."""
-        if not getattr(self, "_nt", None):
+    def _detach(self):
+        """Stop the sweep and stop receiving snapshots for this motor."""
+        self._characterization.abort()
+        if self._nt is None:
             return
         try:
-            data = self._nt.get_motor_data(int(self.device_id))
-        except Exception:
-            print("hello")
+            self._nt.snapshot_ready.disconnect(self._on_snapshot_ready)
+            self._nt.command_finished.disconnect(self._on_command_finished)
+            self._nt.motor_stopped.disconnect(self._on_motor_stopped)
+        except (RuntimeError, TypeError):
+            pass
+        self._nt.remove_motor(int(self.device_id))
+        self._nt = None
+
+    def _on_snapshot_ready(self, motor_id):
+        if self._nt is None or motor_id != int(self.device_id):
+            return
+        data = self._nt.take_snapshot(motor_id)
+        if data is None:
             return
 
+        samples = data.samples
+        self._history.add_samples(samples)
+        self._characterization.add_samples(samples)
+        # Snapshots arrive at the robot loop rate; the trend only needs ~5 Hz
+        if (
+            self.history_button.isChecked()
+            and data.time - self._history_refreshed >= 0.2
+        ):
+            self._history_refreshed = data.time
+            self.history_view.refresh()
+        if self.spectrum_button.isChecked():
+            self._update_spectra(samples)
+        self._update_latency_label(data)
+
         # Format and update UI labels
         try:
             self.voltage_value.setText(f"{data.busVoltage:.1f} V")
@@ -223,27 +289,58 @@ class MotorDisplay(QWidget):
             print("oh no")
             pass
 
-    def _set_cmd_bool(self, key: str, value: bool) -> bool:
-        """Attempt to set a boolean command topic directly via the client's publishers.
-        Returns True on success, False otherwise.
+    def _send_command(self, kind: str, value: float = 0.0) -> bool:
+        """Queue a tracked command on the NT worker; it is sequence-numbered,
+        acknowledged and retried there. Returns True if it was queued.
         """
-        if not getattr(self, "_nt", None):
-            return False
-        try:
-            pubs = self._nt._ensure_cmd_pubs(
-                int(self.device_id)
-            )  # uses client internals
-            pubs[key].set(bool(value))
-            return True
-        except Exception:
+        if self._nt is None:
             return False
+        self._nt.send(int(self.device_id), kind, value)
+        return True
+
+    def _send_operator_command(self, kind: str, value: float = 0.0):
+        """Send a command the operator issued and announce it for recording."""
+        timestamp = time.perf_counter()
+        if self._send_command(kind, value):
+            self.operator_command.emit(int(self.device_id), kind, value, timestamp)
+
+    def _on_command_finished(self, result):
+        """Flag a Stop/Reset the robot never acknowledged; a later command of
+        the same kind that is acknowledged clears the warning."""
+        if result.motor_id != int(self.device_id):
+            return
+        if result.kind not in ("stop", "reset"):
+            return
+        if result.acked:
+            if self._unacked_kind == result.kind:
+                self._unacked_kind = None
+                self.command_warning.hide()
+            return
+        self._unacked_kind = result.kind
+        self.command_warning.setText(
+            f"{result.kind.capitalize()} NOT acknowledged after "
+            f"{result.attempts} attempts"
+        )
+        self.command_warning.show()
+
+    def _update_latency_label(self, data):
+        if data.latency is None:
+            # Commands can be lost before any has ever been acknowledged
+            if data.lost_commands:
+                self.latency_value.setText(
+                    f"Latency: no acks, {data.lost_commands} lost"
+                )
+            return
+        p50, p90, p99 = data.latency
+        self.latency_value.setText(
+            f"Latency p50 {p50 * 1000:.0f} ms, p90 {p90 * 1000:.0f} ms, "
+            f"p99 {p99 * 1000:.0f} ms, {data.lost_commands} lost"
+        )
 
     def _send_desired_speed(self):
         """Read percent from input ([-100, 100]) and command NT in [-1, 1].
-        Also clears a previously latched 'stop' boolean as requested.
+        The client clears a previously sent 'stop' along with the new speed.
         """
-        if not getattr(self, "_nt", None):
-            return
         text = self.desired_speed_input.text().strip()
         if not text:
             return
@@ -253,23 +350,14 @@ class MotorDisplay(QWidget):
             return
         # Clamp to [-100, 100] then scale to [-1, 1]
         pct = max(-100.0, min(100.0, pct))
-
-        # If stop was latched True, clear it now (set back to False)
-        if self._stop_latched:
-            if self._set_cmd_bool("stop", False):
-                self._stop_latched = False
-
-        try:
-            self._nt.set_speed(int(self.device_id), pct / 100.0)
-        except Exception:
-            pass
+        # An operator command takes the motor back from a running sweep
+        self._characterization.abort("aborted by operator command")
+        self._send_operator_command("speed", pct / 100.0)
 
     def _send_reset_position(self):
         """Read target position (rotations) and command NT absolute position.
-        Also clears a previously latched 'reset' boolean as requested.
+        The client clears a previously sent 'reset' along with the new position.
         """
-        if not getattr(self, "_nt", None):
-            return
         text = self.reset_position_input.text().strip()
         if not text:
             return
@@ -277,32 +365,88 @@ class MotorDisplay(QWidget):
             rotations = float(text)
         except ValueError:
             return
-
-        # If reset was latched True, clear it now (set back to False)
-        if self._reset_latched:
-            if self._set_cmd_bool("reset", False):
-                self._reset_latched = False
-
-        try:
-            self._nt.set_position(int(self.device_id), rotations)
-        except Exception:
-            pass
+        self._characterization.abort("aborted by operator command")
+        self._send_operator_command("position", rotations)
 
     def _on_stop_clicked(self):
-        # Latch stop to True; it will be cleared on next desired speed command
-        if self._set_cmd_bool("stop", True):
-            self._stop_latched = True
+        # Abort first so the sweep timer can not command a speed over the stop
+        self._characterization.abort("stopped")
+        self._send_operator_command("stop")
 
     def _on_reset_clicked(self):
-        # Latch reset to True; it will be cleared on next position command
-        if self._set_cmd_bool("reset", True):
-            self._reset_latched = True
+        self._send_operator_command("reset")
+
+    def _sample_clock(self) -> float:
+        # Same time base as the sample timestamps the sweep is split by
+        return self._nt.now() if self._nt is not None else time.monotonic()
+
+    def _send_raw_speed(self, percent_output: float):
+        """Command percent output in [-1, 1] without touching the input field.
+        Sent as a sweep command, so any stop for the motor blocks it."""
+        if self._nt is not None:
+            self._nt.send(int(self.device_id), "speed", percent_output, sweep=True)
+
+    def _on_characterize_clicked(self):
+        if self._characterization.is_running():
+            self._characterization.abort()
+            return
+        if self._nt is None:
+            return
+        self.characterize_button.setText("Abort")
+        self._nt.begin_sweep(int(self.device_id))
+        self._characterization.start()
+
+    def _on_motor_stopped(self, motor_id):
+        # Stops from macros or other cards reach the motor through the worker;
+        # the sweep must not command it again after any of them
+        if motor_id == int(self.device_id):
+            self._characterization.abort("stopped")
+
+    def _on_characterization_phase(self, name):
+        self.fit_value.setText(f"Fit: running {name}...")
+
+    def _on_characterization_aborted(self, reason):
+        self.characterize_button.setText("Characterize")
+        self.fit_value.setText(f"Fit: {reason}")
+        if self._nt is not None:
+            self._nt.end_sweep(int(self.device_id))
+
+    def _on_characterization_finished(self, fit):
+        self.characterize_button.setText("Characterize")
+        if self._nt is not None:
+            self._nt.end_sweep(int(self.device_id))
+        if fit is None:
+            self.fit_value.setText("Fit: no usable data")
+            return
+        self.fit_value.setText(
+            f"kS={fit.kS:.3f} V  kV={fit.kV:.3f} V/rps  kA={fit.kA:.3f} V/rps²\n"
+            f"R²={fit.r_squared:.3f}  RMSE={fit.rmse:.2f} V  n={fit.sample_count}"
+        )
+
+    def _on_history_toggled(self, checked):
+        self.history_button.setText("Hide History" if checked else "Show History")
+        self.history_view.setVisible(checked)
+        if checked:
+            self.history_view.refresh()
+
+    def _on_spectrum_toggled(self, checked):
+        self.spectrum_button.setText("Hide Spectrum" if checked else "Show Spectrum")
+        self.spectrum_view.setVisible(checked)
+        if not checked:
+            # Start from a fresh window next time instead of stale history
+            for spectrum in self._spectra.values():
+                spectrum.reset()
+            self.spectrum_view.clear()
+
+    def _update_spectra(self, samples):
+        for key, spectrum in self._spectra.items():
+            if spectrum.push(samples.get(key, ())):
+                self.spectrum_view.set_trace(
+                    key, spectrum.frequencies(), spectrum.power_db(), spectrum.peak()
+                )
 
     def closeEvent(self, event):
-        # Stop polling when the widget closes; do not stop the shared NT client
-        try:
-            if hasattr(self, "_poll_timer"):
-                self._poll_timer.stop()
-        except Exception:
-            pass
+        # Stop receiving snapshots when the widget closes; do not stop the
+        # shared NT worker
+        self._detach()
         super().closeEvent(event)
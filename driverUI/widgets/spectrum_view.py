@@ -0,0 +1,112 @@
+from PySide6.QtWidgets import QWidget, QSizePolicy
+from PySide6.QtGui import QPainter, QPen, QColor, QPolygonF
+from PySide6.QtCore import Qt, QPointF, QRectF
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+class SpectrumView(QWidget):
+    """Small spectrum plot for a motor card.
+
+    Traces are rebuilt only when `set_trace` is called with a new spectrum,
+    so repaints between updates just redraw cached polygons.
+    """
+
+    DYNAMIC_RANGE_DB = 60.0
+    COLORS = {
+        "velocity": QColor("#4F9DDE"),
+        "outputCurrent": QColor("#E8A33D"),
+    }
+
+    def __init__(self, parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.setMinimumHeight(120)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self._traces: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._peaks: Dict[str, Tuple[float, float]] = {}
+        self._polygons: Dict[str, QPolygonF] = {}
+        self._dirty = True
+
+    def set_trace(
+        self,
+        key: str,
+        freqs: np.ndarray,
+        power_db: np.ndarray,
+        peak: Optional[Tuple[float, float]],
+    ):
+        # Copy: the spectrum object reuses its output buffers
+        self._traces[key] = (freqs, power_db.copy())
+        if peak is not None:
+            self._peaks[key] = peak
+        self._dirty = True
+        self.update()
+
+    def clear(self):
+        self._traces.clear()
+        self._peaks.clear()
+        self._polygons.clear()
+        self._dirty = True
+        self.update()
+
+    def resizeEvent(self, event):
+        self._dirty = True
+        super().resizeEvent(event)
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(4, 18, max(1, self.width() - 8), max(1, self.height() - 34))
+
+    def _rebuild(self):
+        self._polygons.clear()
+        if not self._traces:
+            return
+        rect = self._plot_rect()
+        for key, (freqs, db) in self._traces.items():
+            # Each trace is scaled to its own peak: rpm and amps are not
+            # comparable, only where their peaks sit is
+            top = float(db.max())
+            bottom = top - self.DYNAMIC_RANGE_DB
+            nyquist = float(freqs[-1]) if len(freqs) and freqs[-1] > 0 else 1.0
+            xs = rect.left() + freqs / nyquist * rect.width()
+            clipped = np.clip(db, bottom, top)
+            ys = rect.bottom() - (
+                (clipped - bottom) / self.DYNAMIC_RANGE_DB * rect.height()
+            )
+            self._polygons[key] = QPolygonF(
+                [QPointF(float(x), float(y)) for x, y in zip(xs, ys)]
+            )
+        self._dirty = False
+
+    def paintEvent(self, event):
+        if self._dirty:
+            self._rebuild()
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        rect = self._plot_rect()
+        painter.setPen(QPen(QColor("#4B4B4B"), 1))
+        painter.drawRect(rect)
+
+        if not self._polygons:
+            painter.drawText(rect, Qt.AlignCenter, "Collecting samples...")
+            painter.end()
+            return
+
+        x = 4
+        for key, polygon in self._polygons.items():
+            color = self.COLORS.get(key, QColor("#CCCCCC"))
+            painter.setPen(QPen(color, 1.2))
+            painter.drawPolyline(polygon)
+            peak = self._peaks.get(key)
+            if peak is not None:
+                text = f"{key}: peak {peak[0]:.1f} Hz"
+                painter.drawText(QPointF(x, 13), text)
+                x += painter.fontMetrics().horizontalAdvance(text) + 12
+
+        freqs = next(iter(self._traces.values()))[0]
+        painter.setPen(QPen(QColor("#8A8A8A"), 1))
+        painter.drawText(QPointF(rect.left(), self.height() - 3), "0 Hz")
+        nyquist = f"{float(freqs[-1]):.0f} Hz"
+        width = painter.fontMetrics().horizontalAdvance(nyquist)
+        painter.drawText(QPointF(rect.right() - width, self.height() - 3), nyquist)
+        painter.end()
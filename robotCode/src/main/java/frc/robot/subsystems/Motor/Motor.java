@@ -9,9 +9,12 @@ import edu.wpi.first.networktables.DoublePublisher;
 import edu.wpi.first.networktables.DoubleSubscriber;
 import edu.wpi.first.networktables.BooleanPublisher;
 import edu.wpi.first.networktables.BooleanSubscriber;
+import edu.wpi.first.networktables.IntegerPublisher;
+import edu.wpi.first.networktables.IntegerSubscriber;
 import edu.wpi.first.networktables.NetworkTable;
 import edu.wpi.first.networktables.NetworkTableEvent;
 import edu.wpi.first.networktables.NetworkTableInstance;
+import edu.wpi.first.networktables.PubSubOption;
 import edu.wpi.first.wpilibj2.command.SubsystemBase;
 
 public abstract class Motor extends SubsystemBase implements MotorInterface {
@@ -26,6 +29,7 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
     DoublePublisher velocityPublisher;
     DoublePublisher setSpeedPublisher;
     DoublePublisher positionPublisher;
+    IntegerPublisher ackSeqPublisher;
 
     DoubleSubscriber desiredSpeedSubscriber;
     DoublePublisher desiredSpeedPublisher;
@@ -35,6 +39,7 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
     BooleanPublisher stopPublisher;
     BooleanSubscriber resetSubscriber;
     BooleanPublisher resetPublisher;
+    IntegerSubscriber seqSubscriber;
 
     private final AtomicBoolean updateSpeed = new AtomicBoolean(false);
     private final AtomicBoolean updatePosition = new AtomicBoolean(false);
@@ -45,6 +50,8 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
     private volatile double newPositionCached = 0;
     private volatile boolean stopCached = false;
     private volatile boolean resetCached = false;
+    private volatile long seqCached = -1;
+    private long lastAckedSeq = -1;
 
     public void resetPosition() {
         this.setPosition(Rotations.of(0));
@@ -55,12 +62,17 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
         motorStatsTable = ntInstance.getTable("MotorStats").getSubTable(Integer.toString(getId()));
         motorCommandsTable = ntInstance.getTable("MotorController").getSubTable(Integer.toString(getId()));
 
-        busVoltagePublisher = motorStatsTable.getDoubleTopic("busVoltage").publish();
-        outputCurrentPublisher = motorStatsTable.getDoubleTopic("outputCurrent").publish();
-        temperaturePublisher = motorStatsTable.getDoubleTopic("temperature").publish();
-        velocityPublisher = motorStatsTable.getDoubleTopic("velocity").publish();
-        setSpeedPublisher = motorStatsTable.getDoubleTopic("setSpeed").publish();
-        positionPublisher = motorStatsTable.getDoubleTopic("position").publish();
+        // keepDuplicates so every loop's sample is sent even when a stat is
+        // steady; the UI's sample queues and fits rely on one value per loop
+        PubSubOption keepDuplicates = PubSubOption.keepDuplicates(true);
+        busVoltagePublisher = motorStatsTable.getDoubleTopic("busVoltage").publish(keepDuplicates);
+        outputCurrentPublisher = motorStatsTable.getDoubleTopic("outputCurrent").publish(keepDuplicates);
+        temperaturePublisher = motorStatsTable.getDoubleTopic("temperature").publish(keepDuplicates);
+        velocityPublisher = motorStatsTable.getDoubleTopic("velocity").publish(keepDuplicates);
+        setSpeedPublisher = motorStatsTable.getDoubleTopic("setSpeed").publish(keepDuplicates);
+        positionPublisher = motorStatsTable.getDoubleTopic("position").publish(keepDuplicates);
+        // 5 ms period instead of the 100 ms default so acks are not batched
+        ackSeqPublisher = motorStatsTable.getIntegerTopic("ackSeq").publish(PubSubOption.periodic(0.005));
 
         motorCommandsTable.getDoubleTopic("desiredSpeed").publish().set(0);
         motorCommandsTable.getDoubleTopic("newPosition").publish().set(0);
@@ -71,6 +83,7 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
         newPositionSubscriber = motorCommandsTable.getDoubleTopic("newPosition").subscribe(0);
         stopSubscriber = motorCommandsTable.getBooleanTopic("stop").subscribe(false);
         resetSubscriber = motorCommandsTable.getBooleanTopic("reset").subscribe(false);
+        seqSubscriber = motorCommandsTable.getIntegerTopic("seq").subscribe(-1);
 
         ntInstance.addListener(desiredSpeedSubscriber, EnumSet.of(NetworkTableEvent.Kind.kValueRemote),
                 event -> {
@@ -99,6 +112,13 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
                     resetCached = event.valueData.value.getBoolean();
                     updateReset.set(true);
                 });
+
+        // The UI publishes seq after the command value, so once a seq has been
+        // seen here its command flag is already set
+        ntInstance.addListener(seqSubscriber, EnumSet.of(NetworkTableEvent.Kind.kValueRemote),
+                event -> {
+                    seqCached = event.valueData.value.getInteger();
+                });
     }
 
     public void publishToNT() {
@@ -111,6 +131,7 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
     }
 
     public void updateMotorState() {
+        long seq = seqCached;
         if (updateSpeed.getAndSet(false)) {
             setSpeed(Percent.of(desiredSpeedCached));
             System.out.println(Percent.of(desiredSpeedCached));
@@ -127,6 +148,11 @@ public abstract class Motor extends SubsystemBase implements MotorInterface {
             resetPosition();
             System.out.println("2");
         }
+        if (seq >= 0 && seq != lastAckedSeq) {
+            ackSeqPublisher.set(seq);
+            ntInstance.flush();
+            lastAckedSeq = seq;
+        }
     }
 
     @Override